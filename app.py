@@ -1,17 +1,32 @@
-import base64
 from flask import Flask, render_template, Response, jsonify, request
 from flask_socketio import SocketIO, emit
 import cv2
 import time
 import mediapipe as mp
 import numpy as np
-import pickle
 import os
 import collections
 import json
 import sys
 import threading
-from utils import extract_keypoints
+import datetime
+from utils import extract_keypoints, keypoints_from_landmarks, KEYPOINT_SIZE
+from hands_pool import SessionHandsPool
+from frame_scheduler import FrameScheduler
+from model_store import load_model
+from pipeline import (prepare_frame, finish_frame, frame_payload, payload_bytes, is_binary_payload, draw_hands,
+                      classify_rows, decode_prediction, decoded_labels, frame_scores)
+from inference_workers import InferenceWorkerPool
+from utterances import UtteranceIndex
+from tts_queue import TTSQueue, write_atomically
+from smoothing import make_smoother
+from motion import MotionWindow, MOTION_MODEL_FILE, MOTION_ARTIFACT, WINDOW_FRAMES, mix_scores
+from pacing import FramePacer
+from roi import RoiHands, RoiStats, roi_factory
+from broadcaster import FrameBroadcaster
+from overlay import HandOverlay
+import metrics
+from metrics import span
 
 # Add local site_packages to path
 sys.path.append(os.path.join(os.getcwd(), "site_packages"))
@@ -25,104 +40,282 @@ except ImportError:
     except ImportError:
         pass
 
+# Spawned inference workers re-import this module as __mp_main__ when the app is
+# started with `python app.py`. They only need inference_workers, so everything
+# that loads models, reads audio or starts threads runs in the server process only.
+IS_SERVER_PROCESS = __name__ != '__mp_main__'
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', os.urandom(32))
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*") if IS_SERVER_PROCESS else None
+
+def on_socket(event):
+    """socketio.on in the server process; spawned workers have no SocketIO to register with."""
+    if socketio is None:
+        return lambda handler: handler
+    return socketio.on(event)
 
 # --- CONFIGURATION ---
 MODEL_FILE = "model.p"
+MODEL_ARTIFACT = "model.forest"  # Memory-mapped forest, preferred over the pickle
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 5))  # Seconds, 0 disables the watcher
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')  # Enables POST /admin/reload_model
+WARMUP_ROWS = 4
 AUDIO_DIR = "static/audio"
-CLASSES = [
-    "Nothing", "Hello", "Thank You", "Good", "Bad", "Yes", 
-    "Water", "Food", "Toilet", "Medicine", "Money", 
-    "Help", "Pain", "Call Doctor", "Police", "Home", 
-    "What", "Where", "Time", "I Love You", "Stop",
-    "No", "Please", "Sorry", "Friend", "Mother", 
-    "Book", "Tea", "Name", "Happy" 
-]
-
-PREDICTION_BUFFER_SIZE = 3  # Reduced buffer size for better responsiveness
+
+PREDICTION_BUFFER_SIZE = 3  # Frames that must agree with SMOOTHING_MODE=buffer
+SMOOTHING_MODE = os.environ.get('SMOOTHING_MODE', 'ema')  # 'ema' (probability average) or 'buffer' (legacy)
+SMOOTHING_ALPHA = float(os.environ.get('SMOOTHING_ALPHA', 0.5))  # Weight of the newest frame
+CONFIDENCE_EXIT = 0.3       # Averaged probability below which a stable gesture is released
+SWITCH_MARGIN = 0.1         # Lead a new gesture needs over the current one to take over
 AUDIO_COOLDOWN = 3.0        # Seconds to wait before playing same audio again
-CONFIDENCE_THRESHOLD = 0.5
+TTS_WORKERS = int(os.environ.get('TTS_WORKERS', 2))         # Concurrent gTTS requests
+TTS_QUEUE_SIZE = int(os.environ.get('TTS_QUEUE_SIZE', 32))  # Distinct phrases waiting for TTS
+CONFIDENCE_THRESHOLD = 0.5  # Averaged probability at which a gesture becomes stable
+OVERLAY_MODES = ('server', 'client')  # Who draws the hand overlay for a socket session
+
+# Socket frame batching (frames from all sessions are grouped before inference)
+BATCH_WINDOW_MS = float(os.environ.get('BATCH_WINDOW_MS', 8))
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 8))
+HANDS_POOL_SIZE = int(os.environ.get('HANDS_POOL_SIZE', 8))  # Max tracked sessions
+FRAME_TIMEOUT = 5.0         # Seconds a socket handler waits for its batch result
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 0))  # 0 = process frames in this process
+FRAME_WINDOW = int(os.environ.get('FRAME_WINDOW', 2))  # Frames a client may have in flight
+
+# Adaptive capture pacing (sent to browsers as pacing_update)
+ACTIVE_FRAME_INTERVAL_MS = int(os.environ.get('ACTIVE_FRAME_INTERVAL_MS', 80))  # ~12 fps while a hand is visible
+IDLE_FRAME_INTERVAL_MS = int(os.environ.get('IDLE_FRAME_INTERVAL_MS', 500))     # 2 fps with nobody signing
+IDLE_AFTER_SECONDS = float(os.environ.get('IDLE_AFTER_SECONDS', 3))
+IDLE_MAX_WIDTH = 320        # Capture width while idle
+
+# Region-of-interest cropping: landmark only the area around last frame's hands
+ROI_ENABLED = os.environ.get('ROI_ENABLED', '0') == '1'
+ROI_OPTIONS = {
+    'margin': float(os.environ.get('ROI_MARGIN', 0.25)),  # Box growth on each side, fraction of its size
+    'ttl': float(os.environ.get('ROI_TTL', 1.0)),         # Seconds before a full-frame pass looks for new hands
+    'max_side': 256                                       # Crops are downscaled to at most this many pixels
+}
 
 # --- GLOBAL STATE & LOCKS ---
 state_lock = threading.Lock()
 model = None
+model_info = {}
+motion_model = None  # Optional dynamic-gesture model (train_model.py --motion)
+motion_info = {}
+worker_pool = None
 
 # Store state per socket session ID
 user_sessions = {}
+frame_counters = collections.Counter()  # received / processed / dropped socket frames
+frame_counters_lock = threading.Lock()
+
+def count_frames(event):
+    with frame_counters_lock:
+        frame_counters[event] += 1
+
+# --- LOAD MODEL (Robustly, hot-swappable) ---
+model_reload_lock = threading.Lock()
+
+def model_files_signature(paths=(MODEL_ARTIFACT, MODEL_FILE)):
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+def warm_up_model(candidate):
+    """Run a few dummy extract_keypoints vectors through a freshly loaded model."""
+    n_features = getattr(candidate, 'n_features_in_', KEYPOINT_SIZE)
+    rows = np.vstack([
+        np.zeros((1, n_features)),
+        np.random.default_rng(0).normal(0, 1, (WARMUP_ROWS - 1, n_features))
+    ])
+    predict = getattr(candidate, 'predict_proba', candidate.predict)
+    predict(rows[:1])
+    if len(predict(rows)) != len(rows):
+        raise ValueError("warm-up returned the wrong number of rows")
+
+def reload_model():
+    """
+    Load the model files, warm the new model up, then swap the global reference.
+    - Frames already in a batch keep the model they started with.
+    - On any error the current model stays active.
+    """
+    global model, model_info
+    with model_reload_lock:
+        new_model, new_info = load_model(MODEL_ARTIFACT, MODEL_FILE)
+        warm_up_model(new_model)
+        new_info['loaded_at'] = datetime.datetime.now().isoformat()
+        model_info = new_info
+        model = new_model
+        if worker_pool is not None:
+            worker_pool.reload_model()
+    return new_info
+
+def reload_motion_model():
+    """Load the dynamic-gesture model if its files exist; without them motion recognition is off."""
+    global motion_model, motion_info
+    with model_reload_lock:
+        if not any(os.path.exists(path) for path in (MOTION_ARTIFACT, MOTION_MODEL_FILE)):
+            motion_model, motion_info = None, {}
+            return None
+        new_model, new_info = load_model(MOTION_ARTIFACT, MOTION_MODEL_FILE)
+        warm_up_model(new_model)
+        new_info['loaded_at'] = datetime.datetime.now().isoformat()
+        motion_info = new_info
+        motion_model = new_model
+    return new_info
+
+def watch_model_files():
+    """Poll the model files and hot-reload when a retrained model lands."""
+    last_seen = model_files_signature()
+    last_motion = model_files_signature((MOTION_ARTIFACT, MOTION_MODEL_FILE))
+    while True:
+        socketio.sleep(MODEL_RELOAD_INTERVAL)
+        signature = model_files_signature()
+        if signature != last_seen:
+            last_seen = signature
+            try:
+                info = reload_model()
+                # A stale artifact is re-exported during the load; don't reload that again
+                last_seen = model_files_signature()
+                print(f"🔁 Model reloaded from {info['source']} (trained_at: {info.get('trained_at')})")
+            except Exception as e:
+                print(f"❌ Model reload failed, keeping current model: {e}")
 
-# --- LOAD MODEL (Robustly) ---
-try:
-    with open(MODEL_FILE, "rb") as f:
-        model_dict = pickle.load(f)
-        model = model_dict['model']
-    print("✅ Model loaded successfully!")
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
+        signature = model_files_signature((MOTION_ARTIFACT, MOTION_MODEL_FILE))
+        if signature != last_motion:
+            last_motion = signature
+            try:
+                info = reload_motion_model()
+                last_motion = model_files_signature((MOTION_ARTIFACT, MOTION_MODEL_FILE))
+                print(f"🔁 Motion model {'reloaded from ' + info['source'] if info else 'removed'}")
+            except Exception as e:
+                print(f"❌ Motion model reload failed, keeping current model: {e}")
 
-# --- LOAD TRANSLATIONS ---
-translations = {}
-for lang in ['bengali', 'hindi', 'english']:
+if IS_SERVER_PROCESS:
     try:
-        with open(f"translations/{lang}.json", "r", encoding="utf-8") as f:
-            translations[lang] = json.load(f)
+        reload_model()
+        print(f"✅ Model loaded successfully! ({model_info['source']})")
     except Exception as e:
-        print(f"❌ Error loading {lang} translations: {e}")
-        translations[lang] = {"standard": {}, "polite": {}}
+        print(f"❌ Error loading model: {e}")
+    try:
+        if reload_motion_model():
+            print(f"✅ Motion model loaded ({motion_info['source']}, {motion_info.get('window')}-frame window)")
+    except Exception as e:
+        print(f"❌ Error loading motion model: {e}")
+
+    if MODEL_RELOAD_INTERVAL > 0:
+        socketio.start_background_task(watch_model_files)
+
+# --- LOAD TRANSLATIONS ---
+translations = {}
+utterance_index = None
+if IS_SERVER_PROCESS:
+    for lang in ['bengali', 'hindi', 'english']:
+        try:
+            with open(f"translations/{lang}.json", "r", encoding="utf-8") as f:
+                translations[lang] = json.load(f)
+        except Exception as e:
+            print(f"❌ Error loading {lang} translations: {e}")
+            translations[lang] = {"standard": {}, "polite": {}}
+
+    # Startup-built (lang, polite, gesture) -> text/audio lookup; no disk access per frame
+    utterance_index = UtteranceIndex(translations, AUDIO_DIR)
 
 # --- BACKGROUND AUDIO GENERATOR ---
-def generate_audio_background(text, lang_code, full_path, url):
-    """Generate audio in a separate thread and emit event when done."""
+def generate_audio_background(key):
+    """TTS worker job: synthesize one (lang, polite, gesture) utterance to its mp3."""
+    utterance = utterance_index.get(*key)
+    if utterance.size is not None:
+        return  # Generated since the job was queued
+    tts = gTTS(text=utterance.text, lang=utterance.lang_code, slow=False)
+    write_atomically(utterance.path, tts.save)
+    print(f"✅ [BG] Audio Generated: {utterance.path}")
+    utterance_index.refresh(*key)
+
+def audio_ready(key, waiters, ok):
+    """Deliver play_audio only to the sessions that were waiting on this utterance."""
+    if not ok:
+        return
+    payload = {'audio_url': utterance_index.get(*key).url}
+    if None in waiters:
+        # The MJPEG /video_feed viewer has no socket of its own
+        socketio.emit('play_audio', payload)
+        return
+    for sid in waiters:
+        socketio.emit('play_audio', payload, to=sid)
+
+tts_queue = TTSQueue(generate_audio_background, audio_ready, TTS_WORKERS, TTS_QUEUE_SIZE) if IS_SERVER_PROCESS else None
+
+def play_utterance(lang, polite, gesture, emit_fn, waiter=None):
+    """
+    Emit play_audio for a generated utterance, or queue it for generation.
+    - `waiter` is the socket sid notified when the mp3 is ready (None broadcasts).
+    """
+    utterance = utterance_index.get(lang, polite, gesture)
+    if utterance is None or not utterance.text:
+        return
+    if utterance.size is not None:
+        emit_fn('play_audio', {'audio_url': utterance.url})
+    else:
+        # Generate in BACKGROUND to not block video
+        result = tts_queue.submit((lang, bool(polite), gesture), waiter)
+        metrics.inc('tts_misses_total', result=result)
+
+def sentence_for(lang, polite, gesture):
+    utterance = utterance_index.get(lang, polite, gesture)
+    return utterance.text if utterance is not None else ""
+
+def new_smoother():
+    return make_smoother(
+        SMOOTHING_MODE, PREDICTION_BUFFER_SIZE,
+        alpha=SMOOTHING_ALPHA, enter=CONFIDENCE_THRESHOLD, exit=CONFIDENCE_EXIT, margin=SWITCH_MARGIN
+    )
+
+def update_motion_scores(state, keypoints, scores):
+    """
+    Feed one frame to a session's motion window and mix dynamic gestures into its scores.
+    - No hand: the window restarts, so a movement never spans a gap in tracking.
+    - Without a motion model, or until the window is full, scores pass through unchanged.
+    """
+    current = motion_model
+    if current is None:
+        return scores
+    window = state.get('motion')
+    if keypoints is None or not np.any(keypoints):
+        if window is not None:
+            window.reset()
+        return scores
+    size = motion_info.get('window') or WINDOW_FRAMES
+    if window is None or window.size != size:
+        window = state['motion'] = MotionWindow(size)
     try:
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        tts = gTTS(text=text, lang=lang_code, slow=False)
-        tts.save(full_path)
-        print(f"✅ [BG] Audio Generated: {full_path}")
-        # Notify clients audio is ready
-        socketio.emit('play_audio', {'audio_url': url})
+        with span('motion_window'):
+            features = window.push(keypoints)
+        if features is None:
+            return scores
+        with span('motion_predict'):
+            proba = current.predict_proba(features[np.newaxis, :])[0]
+        return mix_scores(scores, decoded_labels(tuple(current.classes_)), proba)
     except Exception as e:
-        print(f"❌ [BG] TTS Error: {e}")
-
-def get_active_map(lang='bengali', polite=False):
-    t_type = "polite" if polite else "standard"
-    lang_code_map = {'hindi': 'hi', 'english': 'en', 'bengali': 'bn'}
-    return translations.get(lang, {}).get(t_type, {}), lang_code_map.get(lang, 'bn')
+        print(f"⚠️ Motion predict fail: {e}")
+        return scores
 
 # --- MEDIAPIPE SETUP ---
 mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
 
-def draw_robotic_hands(image, hand_landmarks):
-    h, w, c = image.shape
-    connections = mp_hands.HAND_CONNECTIONS
-    
-    # Colors (BGR) for Cyberpunk Theme
-    COLOR_NEON_GREEN = (57, 255, 20)
-    COLOR_CYAN = (255, 255, 0)
-    COLOR_ELECTRIC_BLUE = (255, 128, 0)
-    COLOR_WHITE = (255, 255, 255)
-
-    # 1. Draw Connections (Energy Beams)
-    for connection in connections:
-        start_idx = connection[0]
-        end_idx = connection[1]
-        start_point = (int(hand_landmarks.landmark[start_idx].x * w), int(hand_landmarks.landmark[start_idx].y * h))
-        end_point = (int(hand_landmarks.landmark[end_idx].x * w), int(hand_landmarks.landmark[end_idx].y * h))
-        cv2.line(image, start_point, end_point, COLOR_ELECTRIC_BLUE, 4)
-        cv2.line(image, start_point, end_point, COLOR_CYAN, 2)
-        
-    # 2. Draw Landmarks (Tech Nodes)
-    for idx, landmark in enumerate(hand_landmarks.landmark):
-        cx, cy = int(landmark.x * w), int(landmark.y * h)
-        radius = 8 if idx in [4, 8, 12, 16, 20] else 5
-        cv2.circle(image, (cx, cy), radius + 2, COLOR_ELECTRIC_BLUE, 1)
-        cv2.circle(image, (cx, cy), radius, COLOR_NEON_GREEN, -1)
-        cv2.circle(image, (cx, cy), 2, COLOR_WHITE, -1)
-
-def gen_frames():
-    prediction_buffer = collections.deque(maxlen=PREDICTION_BUFFER_SIZE)
+def capture_frames():
+    """
+    Camera producer for the MJPEG feed, run by a single broadcaster thread.
+    Yields (jpeg bytes, prediction state) for every captured frame.
+    """
+    smoother = new_smoother()
+    motion_state = {'motion': None}
+    overlay = HandOverlay()
     current_prediction = "Nothing"
     last_sent_prediction = "Nothing"
     last_audio_time = 0
@@ -135,236 +328,349 @@ def gen_frames():
         print("❌ Error: Could not open webcam.")
         return
 
-    with mp_hands.Hands(
-        model_complexity=0,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5,
-        max_num_hands=2
-    ) as hands:
+    # Also runs on close(), when the last viewer leaves
+    try:
+        with mp_hands.Hands(
+            model_complexity=0,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+            max_num_hands=2
+        ) as mp_hands_instance:
+            hands = RoiHands(mp_hands_instance, roi_stats, **ROI_OPTIONS) if ROI_ENABLED else mp_hands_instance
         
-        while True:
-            success, frame = cap.read()
-            if not success:
-                break
-
-            frame = cv2.flip(frame, 1)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands.process(frame_rgb)
-            
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
+            while True:
+                with span('mjpeg_capture'):
+                    success, frame = cap.read()
+                if not success:
+                    break
+
+                frame = cv2.flip(frame, 1)
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                with span('mjpeg_hands'):
+                    results = hands.process(frame_rgb)
+                with span('mjpeg_draw'):
+                    draw_hands(frame, results, overlay)
+
+                # --- PREDICTION LOGIC ---
+                scores = {}
+                data_aux = None
+                if results.multi_hand_landmarks and model is not None:
                     try:
-                        draw_robotic_hands(frame, hand_landmarks)
-                    except Exception:
-                        mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-            # --- PREDICTION LOGIC ---
-            raw_prediction = "Nothing"
-            if results.multi_hand_landmarks and model is not None:
-                try:
-                    data_aux = extract_keypoints(results)
-                    prediction_result = model.predict([data_aux])[0]
-                    
-                    if isinstance(prediction_result, str):
-                        raw_prediction = "Nothing" if prediction_result.lower() == "bus" else prediction_result
-                    else:
-                        prediction_index = int(prediction_result)
-                        if 0 <= prediction_index < len(CLASSES):
-                            raw_prediction = CLASSES[prediction_index]
-                except Exception as e:
-                    print(f"⚠️ Predict fail: {e}")
-                    raw_prediction = "Nothing"
-
-            # --- STABILITY LOGIC ---
-            prediction_buffer.append(raw_prediction)
-            
-            if len(prediction_buffer) == PREDICTION_BUFFER_SIZE:
-                if len(set(prediction_buffer)) == 1: 
-                    new_pred = prediction_buffer[0]
-                    
-                    # Lock not strictly needed if only one thread writes, but safer
-                    with state_lock:
-                        if current_prediction != new_pred:
-                            current_prediction = new_pred
-                            print(f"👉 [GESTURE] Verified: {current_prediction}")
-                            
-                            # EMIT UPDATE IMMEDIATELY
-                            active_map, _ = get_active_map(current_lang, is_polite_mode)
-                            sentence = active_map.get(current_prediction, "")
-                            socketio.emit('prediction_update', {
-                                'prediction': current_prediction,
-                                'sentence': sentence
-                            })
-
-            # --- AUDIO TRIGGER LOGIC ---
-            current_time = time.time()
-            if current_prediction != "Nothing":
-                if current_prediction != last_sent_prediction or (current_time - last_audio_time) > AUDIO_COOLDOWN:
-                    last_sent_prediction = current_prediction
-                    last_audio_time = current_time
-                    
-                    # Prepare Audio
-                    folder_name = f"{current_lang}_polite" if is_polite_mode else current_lang
-                    filename = current_prediction.lower().replace(" ", "_")
-                    if is_polite_mode:
-                        filename += "_polite"
-                    
-                    relative_path = f"static/audio/{folder_name}/{filename}.mp3"
-                    full_path = os.path.join(os.getcwd(), relative_path)
-                    url = "/" + relative_path
+                        data_aux = extract_keypoints(results)
+                        with span('mjpeg_predict'):
+                            predictions, _, probas = classify_rows(model, data_aux[np.newaxis, :])
+                        scores = frame_scores(predictions[0], probas[0], getattr(model, 'classes_', None))
+                    except Exception as e:
+                        print(f"⚠️ Predict fail: {e}")
+                        scores = {}
+                scores = update_motion_scores(motion_state, data_aux, scores)
+
+                # --- STABILITY LOGIC ---
+                new_pred = smoother.update(scores)
+
+                # Lock not strictly needed if only one thread writes, but safer
+                with state_lock:
+                    if current_prediction != new_pred:
+                        current_prediction = new_pred
+                        print(f"👉 [GESTURE] Verified: {current_prediction}")
+
+                        # EMIT UPDATE IMMEDIATELY
+                        socketio.emit('prediction_update', {
+                            'prediction': current_prediction,
+                            'sentence': sentence_for(current_lang, is_polite_mode, current_prediction)
+                        })
+
+                # --- AUDIO TRIGGER LOGIC ---
+                current_time = time.time()
+                if current_prediction != "Nothing":
+                    if current_prediction != last_sent_prediction or (current_time - last_audio_time) > AUDIO_COOLDOWN:
+                        last_sent_prediction = current_prediction
+                        last_audio_time = current_time
                     
-                    if os.path.exists(full_path):
-                        socketio.emit('play_audio', {'audio_url': url})
-                    else:
-                        # Generate in BACKGROUND to not block video
-                        active_map, lang_code = get_active_map(current_lang, is_polite_mode)
-                        text = active_map.get(current_prediction, "")
-                        threading.Thread(target=generate_audio_background, args=(text, lang_code, full_path, url)).start()
-            else:
-                last_sent_prediction = "Nothing"
+                        # Prepare Audio
+                        play_utterance(current_lang, is_polite_mode, current_prediction, socketio.emit)
+                else:
+                    last_sent_prediction = "Nothing"
 
-            # Heartbeat Log
-            if (time.time() - last_heartbeat_time) > 20:
-                print(f"💓 [HEARTBEAT] System Active - Last Prediction: {current_prediction}")
-                last_heartbeat_time = time.time()
+                # Heartbeat Log
+                if (time.time() - last_heartbeat_time) > 20:
+                    print(f"💓 [HEARTBEAT] System Active - Last Prediction: {current_prediction}")
+                    last_heartbeat_time = time.time()
                 
-            ret, buffer = cv2.imencode('.jpg', frame)
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                with span('mjpeg_encode'):
+                    ret, buffer = cv2.imencode('.jpg', frame)
+                yield buffer.tobytes(), {'prediction': current_prediction}
+    finally:
+        cap.release()
+        print("📷 Webcam released")
+
 
-    cap.release()
+# One camera, one Hands graph and one encode, shared by every /video_feed viewer
+camera_broadcaster = FrameBroadcaster(capture_frames) if IS_SERVER_PROCESS else None
+
+def gen_frames():
+    """One MJPEG viewer: the newest broadcast frame, skipping any it was too slow for."""
+    for frame_bytes in camera_broadcaster.subscribe():
+        yield (b'--frame\r\n'
+               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
 
 # --- SOCKET EVENTS ---
-@socketio.on('connect')
+@on_socket('connect')
 def handle_connect():
     sid = request.sid
     user_sessions[sid] = {
         'lang': 'bengali',
         'polite': False,
-        'buffer': collections.deque(maxlen=PREDICTION_BUFFER_SIZE),
+        'overlay': 'server',
+        'renderer': HandOverlay(),  # Server-drawn overlay, reused while the hands hold still
+        'smoother': new_smoother(),
+        'motion': None,  # MotionWindow, created with the first hand frame
         'current_prediction': "Nothing",
         'last_sent_prediction': "Nothing",
-        'last_audio_time': 0
+        'last_audio_time': 0,
+        # Latest-frame-wins slot: one frame in processing, at most one waiting
+        'slot_lock': threading.Lock(),
+        'pending_frame': None,
+        'processing': False,
+        'dropped_frames': 0,
+        'pacer': new_pacer()
     }
     print(f"🔌 Client Connected: {sid}")
 
-@socketio.on('disconnect')
+@on_socket('disconnect')
 def handle_disconnect():
     sid = request.sid
     if sid in user_sessions:
         del user_sessions[sid]
+    if worker_pool is not None:
+        worker_pool.release(sid)
+    else:
+        hands_pool.release(sid)
     print(f"🔌 Client Disconnected: {sid}")
 
-@socketio.on('update_settings')
+@on_socket('update_settings')
 def handle_settings(data):
     sid = request.sid
     if sid in user_sessions:
         user_sessions[sid]['lang'] = data.get('lang', 'bengali')
         user_sessions[sid]['polite'] = data.get('polite', False)
-        print(f"⚙️ Settings Updated for {sid}: {user_sessions[sid]['lang']}, Polite: {user_sessions[sid]['polite']}")
-
-# Create a global hands model configured for rapid websocket queries
-socket_hands = mp_hands.Hands(
-    static_image_mode=True,
-    model_complexity=0,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5,
-    max_num_hands=2
-)
-mp_lock = threading.Lock()
-
-@socketio.on('video_frame')
-def handle_video_frame(data):
-    sid = request.sid
-    if sid not in user_sessions:
-        return
-    session = user_sessions[sid]
+        overlay = data.get('overlay', 'server')
+        user_sessions[sid]['overlay'] = overlay if overlay in OVERLAY_MODES else 'server'
+        print(f"⚙️ Settings Updated for {sid}: {user_sessions[sid]['lang']}, Polite: {user_sessions[sid]['polite']}, Overlay: {user_sessions[sid]['overlay']}")
+
+# Each session leases its own tracking-mode Hands instance; frames from every
+# session are micro-batched and classified with one model.predict call per batch.
+roi_stats = RoiStats()
+hands_pool = None
+frame_scheduler = None
+if IS_SERVER_PROCESS:
+    hands_pool = SessionHandsPool(HANDS_POOL_SIZE, roi_factory(roi_stats, **ROI_OPTIONS) if ROI_ENABLED else None)
+    frame_scheduler = FrameScheduler(
+        hands_pool,
+        lambda: model,
+        window=BATCH_WINDOW_MS / 1000.0,
+        max_batch=BATCH_MAX_SIZE
+    )
+
+# Optional multi-process backend: video frames are handed to worker processes
+# through shared memory; landmark-only frames still use the scheduler above.
+if IS_SERVER_PROCESS and INFERENCE_WORKERS > 0:
+    worker_pool = InferenceWorkerPool(
+        INFERENCE_WORKERS, MODEL_ARTIFACT, MODEL_FILE,
+        hands_pool_size=HANDS_POOL_SIZE, timeout=FRAME_TIMEOUT, sleep=socketio.sleep,
+        roi=ROI_OPTIONS if ROI_ENABLED else None
+    )
+    print(f"🧵 Started {INFERENCE_WORKERS} inference worker processes")
+
+def new_pacer():
+    return FramePacer(ACTIVE_FRAME_INTERVAL_MS, IDLE_FRAME_INTERVAL_MS, IDLE_AFTER_SECONDS, IDLE_MAX_WIDTH)
+
+def server_queue_depth():
+    """Frames ahead of a new one: the scheduler's running batch and queue, plus frames held by worker processes."""
+    depth = frame_scheduler.backlog()
+    if worker_pool is not None:
+        depth += worker_pool.in_flight()
+    return depth
+
+def update_session_pacing(session, hand_present, processing_seconds):
+    update = session['pacer'].observe(hand_present, processing_seconds, server_queue_depth())
+    if update is not None:
+        emit('pacing_update', update)
+
+def update_session_prediction(session, scores):
+    """Run the temporal smoother and audio trigger for one socket session."""
     current_lang = session['lang']
     is_polite_mode = session['polite']
+    new_pred = session['smoother'].update(scores)
+
+    with state_lock:
+        if session['current_prediction'] != new_pred:
+            session['current_prediction'] = new_pred
+            emit('prediction_update', {
+                'prediction': session['current_prediction'],
+                'sentence': sentence_for(current_lang, is_polite_mode, session['current_prediction'])
+            })
+
+    current_time = time.time()
+    if session['current_prediction'] != "Nothing":
+        if session['current_prediction'] != session['last_sent_prediction'] or (current_time - session['last_audio_time']) > AUDIO_COOLDOWN:
+            session['last_sent_prediction'] = session['current_prediction']
+            session['last_audio_time'] = current_time
+
+            play_utterance(current_lang, is_polite_mode, session['current_prediction'], emit, request.sid)
+    else:
+        session['last_sent_prediction'] = "Nothing"
+
+def submit_frame(kind, data):
+    """
+    Latest-frame-wins backpressure for one socket session.
+    - If the session is idle, process this frame (and any that arrive meanwhile).
+    - If a frame is already being processed, park this one in the session slot,
+      replacing (and counting as dropped) any older frame still waiting there.
+    - Every received frame is answered with exactly one frame_ack, which returns
+      the client's credit whether the frame was processed or dropped.
+    """
+    sid = request.sid
+    session = user_sessions.get(sid)
+    if session is None:
+        return
+    count_frames('received')
+    with session['slot_lock']:
+        replaced = session['pending_frame'] is not None
+        if replaced:
+            session['dropped_frames'] += 1
+            count_frames('dropped')
+        session['pending_frame'] = (kind, data)
+        if session['processing']:
+            run_now = False
+        else:
+            session['processing'] = True
+            run_now = True
+    if replaced:
+        emit('frame_ack', {'credits': 1, 'window': FRAME_WINDOW, 'dropped': session['dropped_frames']})
+    if not run_now:
+        return
+
+    while True:
+        with session['slot_lock']:
+            pending = session['pending_frame']
+            session['pending_frame'] = None
+            if pending is None:
+                session['processing'] = False
+                return
+        kind, data = pending
+        started = time.perf_counter()
+        try:
+            if kind == 'landmarks':
+                hand_present = process_landmarks_frame(sid, session, data)
+            else:
+                hand_present = process_video_frame(sid, session, data)
+            if hand_present is not None:
+                elapsed = time.perf_counter() - started
+                metrics.observe('frame_total', elapsed)
+                update_session_pacing(session, hand_present, elapsed)
+        finally:
+            count_frames('processed')
+            emit('frame_ack', {'credits': 1, 'window': FRAME_WINDOW, 'dropped': session['dropped_frames']})
+
+@on_socket('video_frame')
+def handle_video_frame(data):
+    submit_frame('video', data)
+
+def run_frame_in_process(sid, session, data, render):
+    """In-process path: decode here, landmark and classify through the batch scheduler."""
+    frame, frame_rgb = prepare_frame(data)
+    job = frame_scheduler.submit(sid, frame_rgb)
+    if not job.wait(FRAME_TIMEOUT):
+        print(f"⚠️ Frame timed out in scheduler for {sid}")
+        return None
+    return finish_frame(frame, job.results, job.prediction, job.confidence, job.keypoints, render,
+                        job.proba, job.classes, session['renderer'])
+
+def process_video_frame(sid, session, data):
+    """Returns whether a hand was found, or None when the frame was dropped."""
     try:
-        if ',' in data:
-            data = data.split(',')[1]
-        
-        image_data = base64.b64decode(data)
-        nparr = np.frombuffer(image_data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Binary clients get binary frames back; data URL clients keep the old format
+        binary = is_binary_payload(data)
+        client_overlay = session['overlay'] == 'client'
+
+        if worker_pool is not None:
+            with span('worker_roundtrip'):
+                outcome = worker_pool.process(sid, payload_bytes(data), render=not client_overlay)
+        else:
+            outcome = run_frame_in_process(sid, session, data, render=not client_overlay)
+        if outcome is None:
+            return
 
-        frame = cv2.flip(frame, 1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        with mp_lock:
-            results = socket_hands.process(frame_rgb)
-        
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                try:
-                    draw_robotic_hands(frame, hand_landmarks)
-                except Exception:
-                    mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                    
         raw_prediction = "Nothing"
-        if results.multi_hand_landmarks and model is not None:
-            try:
-                data_aux = extract_keypoints(results)
-                prediction_result = model.predict([data_aux])[0]
-                
-                if isinstance(prediction_result, str):
-                    raw_prediction = "Nothing" if prediction_result.lower() == "bus" else prediction_result
-                else:
-                    prediction_index = int(prediction_result)
-                    if 0 <= prediction_index < len(CLASSES):
-                        raw_prediction = CLASSES[prediction_index]
-            except Exception as e:
-                print(f"⚠️ Predict fail: {e}")
-                raw_prediction = "Nothing"
-                
-        session['buffer'].append(raw_prediction)
-        
-        if len(session['buffer']) == PREDICTION_BUFFER_SIZE:
-            if len(set(session['buffer'])) == 1: 
-                new_pred = session['buffer'][0]
-                with state_lock:
-                    if session['current_prediction'] != new_pred:
-                        session['current_prediction'] = new_pred
-                        active_map, _ = get_active_map(current_lang, is_polite_mode)
-                        sentence = active_map.get(session['current_prediction'], "")
-                        emit('prediction_update', {
-                            'prediction': session['current_prediction'],
-                            'sentence': sentence
-                        })
-                        
-        current_time = time.time()
-        if session['current_prediction'] != "Nothing":
-            if session['current_prediction'] != session['last_sent_prediction'] or (current_time - session['last_audio_time']) > AUDIO_COOLDOWN:
-                session['last_sent_prediction'] = session['current_prediction']
-                session['last_audio_time'] = current_time
+        if outcome.prediction is not None:
+            raw_prediction = decode_prediction(outcome.prediction)
                 
-                folder_name = f"{current_lang}_polite" if is_polite_mode else current_lang
-                filename = session['current_prediction'].lower().replace(" ", "_")
-                if is_polite_mode:
-                    filename += "_polite"
-                
-                relative_path = f"static/audio/{folder_name}/{filename}.mp3"
-                full_path = os.path.join(os.getcwd(), relative_path)
-                url = "/" + relative_path
-                
-                if os.path.exists(full_path):
-                    emit('play_audio', {'audio_url': url})
-                else:
-                    active_map, lang_code = get_active_map(current_lang, is_polite_mode)
-                    text = active_map.get(session['current_prediction'], "")
-                    threading.Thread(target=generate_audio_background, args=(text, lang_code, full_path, url)).start()
-        else:
-            session['last_sent_prediction'] = "Nothing"
+        scores = frame_scores(outcome.prediction, outcome.proba, outcome.classes)
+        update_session_prediction(session, update_motion_scores(session, outcome.keypoints, scores))
             
-        _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 50]) 
-        frame_bytes = base64.b64encode(buffer).decode('utf-8')
-        emit('processed_frame', 'data:image/jpeg;base64,' + frame_bytes)
+        if client_overlay:
+            # Overlay-as-data: the client already has the video, send only landmarks
+            emit('landmarks_update', {
+                'hands': outcome.hands,
+                'prediction': raw_prediction,
+                'confidence': None if outcome.confidence is None else round(float(outcome.confidence), 3)
+            })
+        else:
+            emit('processed_frame', frame_payload(outcome.jpeg, binary=binary))
+        return outcome.keypoints is not None
         
     except Exception as e:
         print(f"Error processing socket frame: {e}")
 
+def parse_landmarks_payload(data):
+    """
+    Decode a landmarks_frame payload into an extract_keypoints vector.
+    - bytes: 126 little-endian float32 values, already normalized keypoints.
+    - {'keypoints': bytes|list}: same as above.
+    - {'landmarks': bytes|list}: raw (2, 21, 3) landmarks, Left hand first,
+      normalized on the server exactly like extract_keypoints.
+    """
+    raw = False
+    if isinstance(data, dict):
+        raw = 'landmarks' in data
+        data = data.get('landmarks') if raw else data.get('keypoints')
+
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        values = np.frombuffer(data, dtype='<f4')
+    else:
+        values = np.asarray(data, dtype=np.float32).ravel()
+
+    if values.size != KEYPOINT_SIZE or not np.all(np.isfinite(values)):
+        raise ValueError(f"expected {KEYPOINT_SIZE} finite values, got {values.size}")
+    if raw:
+        return keypoints_from_landmarks(values)
+    return values.astype(np.float64)
+
+@on_socket('landmarks_frame')
+def handle_landmarks_frame(data):
+    """Landmark-only clients: skip image decode, MediaPipe and re-encode entirely."""
+    submit_frame('landmarks', data)
+
+def process_landmarks_frame(sid, session, data):
+    """Returns whether the client reported a hand, or None when the frame was dropped."""
+    try:
+        keypoints = parse_landmarks_payload(data)
+
+        scores = {}
+        if np.any(keypoints):
+            job = frame_scheduler.submit_keypoints(sid, keypoints)
+            if not job.wait(FRAME_TIMEOUT):
+                print(f"⚠️ Landmarks timed out in scheduler for {sid}")
+                return
+            scores = frame_scores(job.prediction, job.proba, job.classes)
+
+        update_session_prediction(session, update_motion_scores(session, keypoints, scores))
+        return bool(np.any(keypoints))
+
+    except Exception as e:
+        print(f"Error processing landmarks frame: {e}")
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -373,6 +679,71 @@ def index():
 def video_feed():
     return Response(gen_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
+# --- METRICS ---
+# Sampled only when /metrics is scraped
+if IS_SERVER_PROCESS:
+    metrics.REGISTRY.collector('frames_total', 'counter', "Socket frames by outcome.",
+                               lambda: dict(frame_counters), label='event')
+    metrics.REGISTRY.collector('active_sessions', 'gauge', "Connected socket sessions.",
+                               lambda: len(user_sessions))
+    metrics.REGISTRY.collector('scheduler_pending_frames', 'gauge', "Frames waiting for the next batch.",
+                               frame_scheduler.pending)
+    metrics.REGISTRY.collector('hands_leased', 'gauge', "Hand trackers leased to sessions.",
+                               lambda: hands_pool.stats()['leased'])
+    metrics.REGISTRY.collector('tts_jobs_total', 'counter', "TTS queue jobs by outcome.",
+                               lambda: {k: v for k, v in tts_queue.stats().items() if k not in ('pending', 'max_pending')},
+                               label='outcome')
+    metrics.REGISTRY.collector('tts_pending', 'gauge', "Phrases queued or being synthesized.",
+                               lambda: tts_queue.stats()['pending'])
+    metrics.REGISTRY.collector('pacing_sessions', 'gauge', "Sessions per capture pacing mode.",
+                               lambda: collections.Counter(s['pacer'].mode for s in list(user_sessions.values())),
+                               label='mode')
+    metrics.REGISTRY.collector('roi_frames_total', 'counter', "ROI stage outcomes (in-process trackers).",
+                               roi_stats.snapshot, label='result')
+    metrics.REGISTRY.collector('mjpeg_subscribers', 'gauge', "Open /video_feed viewers.",
+                               lambda: camera_broadcaster.stats()['subscribers'])
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/stats')
+def stats():
+    return jsonify({
+        "scheduler": frame_scheduler.stats(),
+        "stages": metrics.REGISTRY.stage_summary(),
+        "hands_pool": hands_pool.stats(),
+        "tts": tts_queue.stats(),
+        "frames": dict(frame_counters),  # snapshot, counters only ever increase
+        "active_sessions": len(user_sessions),
+        "roi": roi_stats.snapshot() if ROI_ENABLED else None,
+        "mjpeg": camera_broadcaster.stats(),
+        "pacing": collections.Counter(s['pacer'].mode for s in list(user_sessions.values())),
+        "workers": worker_pool.stats() if worker_pool is not None else []
+    })
+
+@app.route('/audio_manifest')
+def audio_manifest():
+    lang = request.args.get('lang', 'bengali')
+    polite = request.args.get('polite', '0') in ('1', 'true')
+    return jsonify(utterance_index.manifest(lang, polite))
+
+@app.route('/model_info')
+def get_model_info():
+    return jsonify({"loaded": model is not None, **model_info,
+                    "motion": {"loaded": motion_model is not None, **motion_info}})
+
+@app.route('/admin/reload_model', methods=['POST'])
+def admin_reload_model():
+    if not ADMIN_TOKEN or request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        return jsonify({"error": "forbidden"}), 403
+    try:
+        info = reload_model()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    print(f"🔁 Model reloaded via admin endpoint from {info['source']}")
+    return jsonify({"status": "reloaded", **info})
+
 @app.route('/log_event')
 def log_event():
     msg = request.args.get('msg', 'Unknown')
@@ -0,0 +1,78 @@
+"""
+Per-call latency of the pickled sklearn forest against its CompiledForest.
+
+- Checks that both paths return identical predictions on every benchmark row.
+- Times single-row calls (one frame, the socket hot path) and small batches
+  (what FrameScheduler sends when several sessions share a batch).
+
+Usage: python benchmarks/bench_classifier.py [--model model.p] [--data dataset]
+Without a data file, rows are drawn from the keypoint range of random noise.
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from fast_forest import compile_model
+from utils import KEYPOINT_SIZE
+
+def load_rows(path, limit):
+    if path and os.path.isdir(path):
+        from dataset_store import DatasetStore
+        return DatasetStore(path).load()[0][:limit].astype(np.float64)
+    if path and os.path.exists(path):
+        import pandas as pd
+        df = pd.read_csv(path, nrows=limit)
+        return df.drop('label', axis=1).to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 1, (limit, KEYPOINT_SIZE))
+
+def time_calls(fn, batches, repeats):
+    timings = []
+    for _ in range(repeats):
+        for batch in batches:
+            start = time.perf_counter()
+            fn(batch)
+            timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1e6
+    return np.mean(timings), np.percentile(timings, 50), np.percentile(timings, 95)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sklearn vs compiled forest predict")
+    parser.add_argument('--model', default='model.p')
+    parser.add_argument('--data', default='dataset', help="Dataset directory or a legacy data.csv")
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f:
+        forest = pickle.load(f)['model']
+    compiled = compile_model(forest)
+    if compiled is forest:
+        print(f"Error: {type(forest).__name__} is not a tree ensemble, nothing to compile.")
+        return
+
+    rows = load_rows(args.data, args.rows)
+    matches = np.array_equal(forest.predict(rows), compiled.predict(rows))
+    print(f"Model: {type(forest).__name__}, {compiled.n_estimators} trees, depth {compiled.max_depth}")
+    print(f"Predictions identical on {len(rows)} rows: {matches}\n")
+
+    print(f"{'path':<22} {'batch':>5} {'mean us':>10} {'p50 us':>10} {'p95 us':>10}")
+    for batch_size in (1, 8):
+        batches = [rows[i:i + batch_size] for i in range(0, len(rows) - batch_size + 1, batch_size)]
+        # sklearn single-row calls are slow; keep its sample small
+        sk_batches = batches[:max(1, 50 // batch_size)]
+        for name, fn, sample, repeats in (
+            ('sklearn predict', forest.predict, sk_batches, 1),
+            ('CompiledForest.predict', compiled.predict, batches, args.repeats),
+        ):
+            mean, p50, p95 = time_calls(fn, sample, repeats)
+            print(f"{name:<22} {batch_size:>5} {mean:>10.1f} {p50:>10.1f} {p95:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Per-frame cost of motion window features: MotionWindow's incremental update
+against recomputing mean/std/displacement/velocity/path over the whole window.
+
+The incremental cost should stay flat as the window grows; the recompute grows
+linearly with it. That both paths produce the same features is checked in
+tests/test_motion.py.
+
+Usage: python benchmarks/bench_motion.py [--windows 8 16 32 64 128] [--frames 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from motion import MotionWindow
+from utils import KEYPOINT_SIZE
+
+def recompute_features(window):
+    """The naive path: every feature from the full (size, KEYPOINT_SIZE) window."""
+    return np.concatenate([
+        window.mean(axis=0), window.std(axis=0), window[-1] - window[0],
+        window[-1] - window[-2], np.abs(np.diff(window, axis=0)).mean(axis=0)
+    ])
+
+def time_incremental(rows, size):
+    window = MotionWindow(size)
+    for row in rows[:size]:
+        window.push(row)
+    start = time.perf_counter()
+    for row in rows[size:]:
+        window.push(row)
+    return (time.perf_counter() - start) / (len(rows) - size)
+
+def time_recompute(rows, size):
+    start = time.perf_counter()
+    for t in range(size, len(rows)):
+        recompute_features(rows[t - size + 1:t + 1])
+    return (time.perf_counter() - start) / (len(rows) - size)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental vs recomputed motion window features")
+    parser.add_argument('--windows', type=int, nargs='*', default=[8, 16, 32, 64, 128])
+    parser.add_argument('--frames', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = np.cumsum(rng.normal(0, 0.05, (args.frames + max(args.windows), KEYPOINT_SIZE)), axis=0)
+
+    print(f"{'window':>6} {'incremental us':>15} {'recompute us':>13} {'speedup':>8}")
+    for size in args.windows:
+        incremental = time_incremental(rows, size)
+        recompute = time_recompute(rows, size)
+        print(f"{size:>6} {incremental * 1e6:>15.1f} {recompute * 1e6:>13.1f} {recompute / incremental:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Per-frame cost of the robotic hand overlay: the original per-landmark renderer
+(two cv2.line calls per edge, three cv2.circle calls per node) against the
+vectorized one in overlay.py, with and without HandOverlay's stamp cache.
+
+Scenarios on synthetic two-hand frames:
+- still:  hands jitter by under a pixel, as when holding a static sign (cache hits)
+- moving: hands travel a few pixels per frame (every frame is redrawn)
+
+Also reports how many pixels differ from the original renderer, as a share of
+the pixels the overlay draws.
+
+Usage: python benchmarks/bench_overlay.py [--frames 300] [--width 640 --height 480]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from overlay import HandOverlay, render_hand, landmark_pixels, COLOR_NEON_GREEN, COLOR_CYAN, COLOR_ELECTRIC_BLUE, COLOR_WHITE
+from pipeline import mp_hands
+
+def legacy_draw_robotic_hands(image, hand_landmarks):
+    """The renderer overlay.py replaced, kept as the reference."""
+    h, w, c = image.shape
+    for start_idx, end_idx in mp_hands.HAND_CONNECTIONS:
+        start_point = (int(hand_landmarks.landmark[start_idx].x * w), int(hand_landmarks.landmark[start_idx].y * h))
+        end_point = (int(hand_landmarks.landmark[end_idx].x * w), int(hand_landmarks.landmark[end_idx].y * h))
+        cv2.line(image, start_point, end_point, COLOR_ELECTRIC_BLUE, 4)
+        cv2.line(image, start_point, end_point, COLOR_CYAN, 2)
+    for idx, landmark in enumerate(hand_landmarks.landmark):
+        cx, cy = int(landmark.x * w), int(landmark.y * h)
+        radius = 8 if idx in [4, 8, 12, 16, 20] else 5
+        cv2.circle(image, (cx, cy), radius + 2, COLOR_ELECTRIC_BLUE, 1)
+        cv2.circle(image, (cx, cy), radius, COLOR_NEON_GREEN, -1)
+        cv2.circle(image, (cx, cy), 2, COLOR_WHITE, -1)
+
+def hand_shape(size):
+    """(21, 2) normalized offsets of an open hand: wrist, thumb, then four fingers as rays."""
+    points = [(0.0, 0.0)]
+    for finger, angle in enumerate((-60, -25, -5, 15, 35)):
+        direction = np.array([np.sin(np.radians(angle)), -np.cos(np.radians(angle))])
+        base = 0.3 if finger == 0 else 0.45
+        for joint in range(4):
+            points.append(tuple(direction * (base + 0.14 * joint) * size))
+    return np.array(points)
+
+class FakeResults:
+    def __init__(self, hands):
+        self.multi_hand_landmarks = hands
+
+def make_hand(points):
+    hand = landmark_pb2.NormalizedLandmarkList()
+    for x, y in points:
+        lm = hand.landmark.add()
+        lm.x, lm.y, lm.z = x, y, 0.0
+    return hand
+
+def frames(scenario, count, width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    shape = hand_shape(0.35)
+    centers = np.array([(0.3, 0.7), (0.7, 0.7)])
+    for t in range(count):
+        if scenario == 'moving':
+            offset = np.array([np.sin(t / 10), np.cos(t / 10)]) * 0.1
+        else:
+            offset = np.zeros(2)
+        # Sub-pixel tracker noise around the pose
+        jitter = rng.uniform(-0.4, 0.4, (len(centers), 21, 2)) / (width, height)
+        yield FakeResults([make_hand(shape + center + offset + noise) for center, noise in zip(centers, jitter)])
+
+def time_renderer(draw, results_list, background):
+    timings = []
+    for results in results_list:
+        image = background.copy()
+        start = time.perf_counter()
+        draw(image, results)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1e6
+    return np.mean(timings), np.percentile(timings, 95)
+
+def pixel_difference(results, background):
+    reference, vectorized = background.copy(), background.copy()
+    for hand_landmarks in results.multi_hand_landmarks:
+        legacy_draw_robotic_hands(reference, hand_landmarks)
+        h, w = vectorized.shape[:2]
+        render_hand(vectorized, landmark_pixels(hand_landmarks, w, h))
+    drawn = np.any(reference != background, axis=2).sum()
+    return np.any(reference != vectorized, axis=2).sum() / max(1, drawn)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the legacy vs vectorized hand overlay renderer")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    background = np.random.default_rng(1).integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+
+    def legacy(image, results):
+        for hand_landmarks in results.multi_hand_landmarks:
+            legacy_draw_robotic_hands(image, hand_landmarks)
+
+    def vectorized(image, results):
+        h, w = image.shape[:2]
+        for hand_landmarks in results.multi_hand_landmarks:
+            render_hand(image, landmark_pixels(hand_landmarks, w, h))
+
+    print(f"Two hands on {args.width}x{args.height}, {args.frames} frames per scenario\n")
+    print(f"{'renderer':<22} {'scenario':>8} {'mean us':>9} {'p95 us':>9} {'speedup':>8}")
+    for scenario in ('still', 'moving'):
+        results_list = list(frames(scenario, args.frames, args.width, args.height))
+        base_mean, _ = time_renderer(legacy, results_list, background)
+        overlay = HandOverlay()
+        for name, draw in (('legacy (cv2 per node)', legacy),
+                           ('vectorized', vectorized),
+                           ('HandOverlay (cached)', overlay.draw)):
+            mean, p95 = time_renderer(draw, results_list, background)
+            print(f"{name:<22} {scenario:>8} {mean:>9.1f} {p95:>9.1f} {base_mean / mean:>7.2f}x")
+        print(f"{'':<22} {'':>8} cache hits {overlay.hits}, misses {overlay.misses}\n")
+
+    differences = [pixel_difference(r, background) for r in frames('moving', 50, args.width, args.height)]
+    print(f"Pixels differing from the legacy renderer: {np.mean(differences) * 100:.2f}% of overlay pixels "
+          f"(max {np.max(differences) * 100:.2f}%)")
+
+if __name__ == "__main__":
+    main()
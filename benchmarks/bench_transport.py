@@ -0,0 +1,93 @@
+"""
+Compares the two video_frame transports end to end on the server side:
+- data URL: base64 JPEG strings (legacy canvas.toDataURL path)
+- binary:   raw JPEG bytes as socket.io binary attachments
+
+Reports bytes per frame in each direction and server CPU per frame for the
+decode -> flip -> encode work that differs between the modes (MediaPipe and
+the classifier cost the same in both and are left out).
+
+Usage: python benchmarks/bench_transport.py [--image frame.jpg] [--frames 300]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import base64
+import cv2
+import numpy as np
+
+from pipeline import decode_frame, encode_frame, DATA_URL_PREFIX
+
+def synthetic_frame(width, height):
+    """A webcam-like frame: smooth gradients, a few shapes and sensor noise."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    frame = np.dstack([
+        (x * 255 / width), (y * 255 / height), ((x + y) * 127 / (width + height))
+    ]).astype(np.uint8)
+    cv2.circle(frame, (width // 2, height // 2), height // 4, (40, 160, 220), -1)
+    cv2.rectangle(frame, (width // 8, height // 8), (width // 3, height // 2), (200, 60, 60), -1)
+    noise = rng.normal(0, 6, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+def client_payload(frame, binary):
+    """What the browser sends: canvas JPEG at quality 0.5."""
+    _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 50])
+    if binary:
+        return buffer.tobytes()
+    return DATA_URL_PREFIX + base64.b64encode(buffer).decode('ascii')
+
+def run_mode(frame, binary, frames):
+    payload = client_payload(frame, binary)
+    reply = None
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(frames):
+        decoded = cv2.flip(decode_frame(payload), 1)
+        reply = encode_frame(decoded, binary=binary)
+    cpu = (time.process_time() - cpu_start) / frames
+    wall = (time.perf_counter() - wall_start) / frames
+    return {
+        'mode': 'binary' if binary else 'data URL',
+        'bytes_in': len(payload),
+        'bytes_out': len(reply),
+        'cpu_ms': cpu * 1000,
+        'wall_ms': wall * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark video_frame transports")
+    parser.add_argument('--image', help='Use a recorded frame instead of a synthetic one')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    if args.image:
+        frame = cv2.imread(args.image)
+        if frame is None:
+            print(f"Error: could not read {args.image}")
+            return
+    else:
+        frame = synthetic_frame(args.width, args.height)
+
+    h, w = frame.shape[:2]
+    print(f"Frame: {w}x{h}, {args.frames} iterations per mode\n")
+    rows = [run_mode(frame, binary, args.frames) for binary in (False, True)]
+
+    print(f"{'mode':<10} {'bytes in':>10} {'bytes out':>10} {'cpu ms':>8} {'wall ms':>8}")
+    for row in rows:
+        print(f"{row['mode']:<10} {row['bytes_in']:>10} {row['bytes_out']:>10} "
+              f"{row['cpu_ms']:>8.3f} {row['wall_ms']:>8.3f}")
+
+    legacy, binary = rows
+    saved = 1 - (binary['bytes_in'] + binary['bytes_out']) / (legacy['bytes_in'] + legacy['bytes_out'])
+    print(f"\nBinary transport: {saved * 100:.1f}% fewer bytes per round trip, "
+          f"{legacy['cpu_ms'] - binary['cpu_ms']:.3f} ms less server CPU per frame")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Capacity test: N simulated browsers streaming video_frame to a running app.py.
+
+Each client connects with python-socketio, sends update_settings, then streams a
+sample frame at --fps in the browser's format (JPEG quality 50 data URL, or raw
+bytes with --binary). It obeys the same frame_ack credit window as the browser,
+so an overloaded server shows up as fewer processed frames, not an unbounded queue.
+Server pacing_update hints are ignored so the offered load stays fixed.
+
+Recorded per client:
+- processed_frame latency (landmarks_update with --overlay client): send time of the
+  frame being answered to its result
+- prediction_update latency (only when the sample frames contain a hand)
+- server drops (from frame_ack), frames skipped for lack of credit, unanswered frames
+
+The client count ramps (--start, then doubling or +--step) until a step misses the
+targets: p95 latency above --latency-budget-ms, or processed fps per client below
+--min-fps-ratio of --fps. The last passing step is the sustainable capacity.
+The generator's own CPU use is printed too: if it nears a core, the numbers
+describe the load generator rather than the server.
+
+python-socketio falls back to long-polling unless websocket-client is installed
+(pip install "python-socketio[client]"); install it to test the transport browsers use.
+
+Usage:
+    python app.py &    # or: INFERENCE_WORKERS=4 python app.py
+    python benchmarks/load_test.py [--url http://127.0.0.1:5000] [--fps 12] [--width 640 --height 480]
+                                   [--image frame.jpg | --frames dir] [--max-clients 64] [--json out.json]
+"""
+import argparse
+import base64
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import cv2
+import numpy as np
+import socketio
+
+from bench_transport import synthetic_frame
+
+CONNECT_TIMEOUT = 10.0
+ACK_TIMEOUT = 2.0  # Same lost-ack reset as the browser's FRAME_ACK_TIMEOUT_MS
+
+def load_payloads(image, frames_dir, width, height, binary):
+    """Sample frames resized to width x height and encoded like canvas.toDataURL('image/jpeg', 0.5)."""
+    if frames_dir:
+        names = sorted(n for n in os.listdir(frames_dir) if n.lower().endswith(('.jpg', '.jpeg', '.png')))
+        images = [cv2.imread(os.path.join(frames_dir, n)) for n in names]
+    elif image:
+        images = [cv2.imread(image)]
+    else:
+        images = [synthetic_frame(width, height)]
+    images = [img for img in images if img is not None]
+    if not images:
+        raise SystemExit("Error: no readable sample frames")
+
+    payloads = []
+    for img in images:
+        img = cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+        _, buffer = cv2.imencode('.jpg', img, [int(cv2.IMWRITE_JPEG_QUALITY), 50])
+        if binary:
+            payloads.append(buffer.tobytes())
+        else:
+            payloads.append('data:image/jpeg;base64,' + base64.b64encode(buffer).decode('ascii'))
+    return payloads
+
+class SimulatedClient:
+    """
+    One browser session.
+    - Frames in flight never exceed the server's advertised window (1 until the first ack).
+    - The server answers a session's frames in order, so a processed_frame belongs to
+      the oldest frame still in flight; a frame_ack whose `dropped` count grew retires
+      the frame that was waiting behind it in the server's latest-frame-wins slot.
+    """
+
+    def __init__(self, url, payloads, fps, settings):
+        self.url = url
+        self.payloads = payloads
+        self.interval = 1.0 / fps
+        self.settings = settings
+        self.sio = socketio.Client(reconnection=False)
+        self.lock = threading.Lock()
+        self.window = 1
+        self.in_flight = collections.deque()  # Send times of unanswered frames
+        self.awaiting_ack = 0                 # Answered frames whose ack has not arrived yet
+        self.server_dropped = 0
+        self.last_ack = 0.0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.reset()
+
+        # Client-overlay sessions get landmarks_update in place of processed_frame
+        result_event = 'landmarks_update' if settings.get('overlay') == 'client' else 'processed_frame'
+        self.sio.on(result_event, self._on_processed)
+        self.sio.on('prediction_update', self._on_prediction)
+        self.sio.on('frame_ack', self._on_ack)
+
+    def reset(self):
+        """Start a new measurement step (in-flight frames carry over)."""
+        with self.lock:
+            self.sent = 0
+            self.processed = 0
+            self.dropped = 0
+            self.skipped = 0
+            self.unanswered = 0
+            self.latencies = []
+            self.prediction_latencies = []
+
+    # --- SOCKET EVENTS ---
+    def _on_processed(self, data):
+        now = time.perf_counter()
+        with self.lock:
+            if self.in_flight:
+                self.latencies.append(now - self.in_flight.popleft())
+                self.awaiting_ack += 1
+            self.processed += 1
+
+    def _on_prediction(self, data):
+        # Emitted while the oldest in-flight frame is being processed
+        now = time.perf_counter()
+        with self.lock:
+            if self.in_flight:
+                self.prediction_latencies.append(now - self.in_flight[0])
+
+    def _on_ack(self, data):
+        with self.lock:
+            self.last_ack = time.perf_counter()
+            self.window = data.get('window') or self.window
+            dropped = data.get('dropped', self.server_dropped)
+            if dropped > self.server_dropped:
+                # The replaced frame sat behind the one being processed
+                for _ in range(dropped - self.server_dropped):
+                    if len(self.in_flight) > 1:
+                        del self.in_flight[1]
+                    elif self.in_flight:
+                        self.in_flight.popleft()
+                self.dropped += dropped - self.server_dropped
+                self.server_dropped = dropped
+            elif self.awaiting_ack:
+                self.awaiting_ack -= 1
+            elif self.in_flight:
+                # Acked without a result: timed out or failed on the server
+                self.in_flight.popleft()
+                self.unanswered += 1
+
+    # --- STREAMING ---
+    def start(self):
+        self.sio.connect(self.url, wait_timeout=CONNECT_TIMEOUT)
+        self.sio.emit('update_settings', self.settings)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        next_send = time.perf_counter()
+        i = 0
+        while not self.stop_event.is_set():
+            now = time.perf_counter()
+            with self.lock:
+                if self.in_flight and now - self.last_ack > ACK_TIMEOUT:
+                    self.unanswered += len(self.in_flight)
+                    self.in_flight.clear()
+                    self.awaiting_ack = 0
+                if len(self.in_flight) + self.awaiting_ack < self.window:
+                    if not self.in_flight:
+                        self.last_ack = now
+                    self.in_flight.append(now)
+                    self.sent += 1
+                    send = True
+                else:
+                    self.skipped += 1
+                    send = False
+            if send:
+                try:
+                    self.sio.emit('video_frame', self.payloads[i % len(self.payloads)])
+                except socketio.exceptions.SocketIOError:
+                    return
+                i += 1
+            next_send += self.interval
+            self.stop_event.wait(max(0.0, next_send - time.perf_counter()))
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.sio.disconnect()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'sent': self.sent, 'processed': self.processed, 'dropped': self.dropped,
+                'skipped': self.skipped, 'unanswered': self.unanswered,
+                'latencies': list(self.latencies), 'prediction_latencies': list(self.prediction_latencies)
+            }
+
+# --- RAMP ---
+def percentiles_ms(values):
+    if not values:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    ms = np.array(values) * 1000
+    return {f'p{q}_ms': round(float(np.percentile(ms, q)), 1) for q in (50, 95, 99)}
+
+def measure_step(clients, duration, warmup, fps):
+    time.sleep(warmup)
+    for client in clients:
+        client.reset()
+    cpu_start, started = time.process_time(), time.perf_counter()
+    time.sleep(duration)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_start
+    snapshots = [client.snapshot() for client in clients]
+
+    total = {key: sum(s[key] for s in snapshots) for key in ('sent', 'processed', 'dropped', 'skipped', 'unanswered')}
+    latencies = [v for s in snapshots for v in s['latencies']]
+    prediction_latencies = [v for s in snapshots for v in s['prediction_latencies']]
+    return {
+        'clients': len(clients),
+        'offered_fps': round(fps * len(clients), 1),
+        'processed_fps': round(total['processed'] / elapsed, 1),
+        'processed_fps_per_client': round(total['processed'] / elapsed / len(clients), 2),
+        **total,
+        'latency': percentiles_ms(latencies),
+        'prediction_latency': percentiles_ms(prediction_latencies),
+        'generator_cpu_percent': round(100 * cpu / elapsed, 1)
+    }
+
+def step_passes(result, fps, latency_budget_ms, min_fps_ratio):
+    p95 = result['latency']['p95_ms']
+    return (p95 is not None and p95 <= latency_budget_ms
+            and result['processed_fps_per_client'] >= min_fps_ratio * fps)
+
+def print_row(result, ok):
+    lat = result['latency']
+    print(f"{result['clients']:>7} {result['offered_fps']:>8} {result['processed_fps']:>9} "
+          f"{result['processed_fps_per_client']:>8} {str(lat['p50_ms']):>8} {str(lat['p95_ms']):>8} "
+          f"{str(lat['p99_ms']):>8} {result['dropped']:>7} {result['skipped']:>7} {result['unanswered']:>6} "
+          f"{result['generator_cpu_percent']:>6}%  {'ok' if ok else 'SATURATED'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp simulated Socket.IO clients until the server saturates")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--fps', type=float, default=12.0, help="Frames per second per client (browser: ~12)")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--image', help="Sample frame (a frame with a hand exercises the classifier)")
+    parser.add_argument('--frames', help="Directory of sample frames, sent in a loop")
+    parser.add_argument('--binary', action='store_true', help="Raw JPEG bytes instead of data URLs")
+    parser.add_argument('--overlay', choices=('server', 'client'), default='server')
+    parser.add_argument('--start', type=int, default=1)
+    parser.add_argument('--step', type=int, default=0, help="Clients added per step (0 = double each step)")
+    parser.add_argument('--max-clients', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0, help="Measured seconds per step")
+    parser.add_argument('--warmup', type=float, default=2.0, help="Unmeasured seconds after each ramp")
+    parser.add_argument('--latency-budget-ms', type=float, default=250.0)
+    parser.add_argument('--min-fps-ratio', type=float, default=0.9)
+    parser.add_argument('--json', help="Write every step's results here")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.image, args.frames, args.width, args.height, args.binary)
+    settings = {'lang': 'english', 'polite': False, 'overlay': args.overlay}
+    print(f"🚀 {args.url}: {args.width}x{args.height} @ {args.fps} fps per client, "
+          f"{'binary' if args.binary else 'data URL'} frames of ~{len(payloads[0]) // 1024} KB")
+    print(f"{'clients':>7} {'offered':>8} {'processed':>9} {'per-cli':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'dropped':>7} {'skipped':>7} {'lost':>6} {'gen cpu':>7}")
+
+    clients, results = [], []
+    sustained, saturated_at, connect_error = 0, None, None
+    n = max(1, args.start)
+    try:
+        while n <= args.max_clients:
+            while len(clients) < n:
+                client = SimulatedClient(args.url, payloads, args.fps, settings)
+                client.start()
+                clients.append(client)
+            result = measure_step(clients, args.duration, args.warmup, args.fps)
+            ok = step_passes(result, args.fps, args.latency_budget_ms, args.min_fps_ratio)
+            result['ok'] = ok
+            results.append(result)
+            print_row(result, ok)
+            if not ok:
+                saturated_at = n
+                break
+            sustained = n
+            n = n + args.step if args.step else n * 2
+    except socketio.exceptions.ConnectionError as e:
+        connect_error = e
+        print(f"❌ Could not connect client {len(clients) + 1}: {e}")
+    finally:
+        for client in clients:
+            client.stop()
+
+    if not results:
+        # Nothing was measured (server down, wrong --url): not a capacity of 0
+        raise SystemExit(f"Error: no step completed; {len(clients)} client(s) connected to {args.url}")
+    if connect_error is not None:
+        print(f"\n⚠️ Stopped at {n} clients: a client could not connect; sustained {sustained}")
+    elif saturated_at is None:
+        print(f"\n✅ No saturation up to {sustained} clients")
+    else:
+        print(f"\n📈 Saturation at {saturated_at} clients; sustained {sustained} "
+              f"(p95 <= {args.latency_budget_ms:.0f} ms, >= {args.min_fps_ratio:.0%} of {args.fps} fps)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'config': vars(args), 'sustained_clients': sustained,
+                       'saturated_at': saturated_at, 'steps': results}, f, indent=2)
+        print(f"✅ Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
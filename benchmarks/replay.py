@@ -0,0 +1,282 @@
+"""
+Replays recorded input through the socket frame path without a server or browser:
+decode -> flip -> hands -> extract_keypoints -> predict -> smoothing -> draw -> encode,
+the same functions and metric spans handle_video_frame runs in-process, one session,
+one frame at a time.
+
+Corpora:
+- --frames DIR: image files in name order, sent as-is (binary transport payloads)
+- --video FILE: every frame JPEG-encoded at the browser's quality first
+- --landmarks FILE.npz: pre-extracted keypoint streams, no MediaPipe involved.
+  `keypoints` (T, 126) with all-zero rows for no-hand frames, optional `truth` (T,)
+  labels. Image runs write one with --save-landmarks; --landmarks-from-dataset
+  builds a labelled one from recordings in the dataset store.
+
+Prints one JSON document (or writes it to --out): frames/sec, per-stage latency
+percentiles, peak RSS and the git commit, so runs can be compared across commits.
+
+Usage:
+    python benchmarks/replay.py --frames recordings/session1 --out before.json
+    python benchmarks/replay.py --video clip.mp4 --save-landmarks clip.npz
+    python benchmarks/replay.py --landmarks clip.npz --alpha 0.6
+    python benchmarks/replay.py --landmarks-from-dataset stream.npz --segments 100
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+import metrics
+from utils import KEYPOINT_SIZE
+from smoothing import make_smoother, evaluate, build_keypoint_stream
+from pipeline import classify_rows, frame_scores
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+WARMUP_FRAMES = 5  # MediaPipe's first calls load graphs; keep them out of the numbers
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+# --- CORPORA ---
+def iter_image_dir(path):
+    names = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTENSIONS))
+    if not names:
+        raise SystemExit(f"Error: no {'/'.join(IMAGE_EXTENSIONS)} files in {path}")
+    for name in names:
+        with open(os.path.join(path, name), "rb") as f:
+            yield f.read()
+
+def iter_video(path):
+    import cv2
+    from pipeline import encode_jpeg
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"Error: cannot open video {path}")
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                return
+            # What the browser sends: a canvas JPEG of the camera frame
+            yield bytes(encode_jpeg(frame))
+    finally:
+        cap.release()
+
+def load_landmarks(path):
+    data = np.load(path, allow_pickle=False)
+    keypoints = np.asarray(data['keypoints'], dtype=np.float64)
+    if keypoints.ndim != 2 or keypoints.shape[1] != KEYPOINT_SIZE:
+        raise SystemExit(f"Error: {path} keypoints must be (T, {KEYPOINT_SIZE}), got {keypoints.shape}")
+    truth = data['truth'].tolist() if 'truth' in data.files else None
+    return keypoints, truth
+
+# --- REPLAY ---
+def predict_and_smooth(model, smoother, keypoints):
+    """
+    The per-frame tail shared by both corpora, through the server's own
+    classify_rows and frame_scores (decode_prediction labels). Returns (scores, stable label).
+    """
+    scores = {}
+    if keypoints is not None and np.any(keypoints):
+        with metrics.span('predict'):
+            predictions, _, proba = classify_rows(model, keypoints[np.newaxis, :])
+        scores = frame_scores(predictions[0], proba[0], getattr(model, 'classes_', None))
+    with metrics.span('smooth'):
+        stable = smoother.update(scores)
+    return scores, stable
+
+def replay_images(payloads, model, smoother, hands, render, limit, on_warm):
+    """Returns (scores per frame, stable label per frame, keypoints per frame)."""
+    from pipeline import prepare_frame, finish_frame
+    from utils import extract_keypoints
+    from overlay import HandOverlay
+
+    all_scores, stable_labels, all_keypoints = [], [], []
+    overlay = HandOverlay()
+    for i, payload in enumerate(payloads):
+        if limit and i >= limit:
+            break
+        if i == WARMUP_FRAMES:
+            on_warm()
+        started = time.perf_counter()
+        frame, frame_rgb = prepare_frame(payload)
+        with metrics.span('hands'):
+            results = hands.process(frame_rgb)
+        keypoints = None
+        if results.multi_hand_landmarks:
+            with metrics.span('keypoints'):
+                keypoints = extract_keypoints(results)
+        scores, stable = predict_and_smooth(model, smoother, keypoints)
+        finish_frame(frame, results, None, None, keypoints, render, overlay=overlay)
+        metrics.observe('frame_total', time.perf_counter() - started)
+
+        all_scores.append(scores)
+        stable_labels.append(stable)
+        all_keypoints.append(np.zeros(KEYPOINT_SIZE) if keypoints is None else keypoints)
+    return all_scores, stable_labels, all_keypoints
+
+def replay_landmarks(keypoints, model, smoother, limit, on_warm):
+    all_scores, stable_labels = [], []
+    for i, row in enumerate(keypoints[:limit] if limit else keypoints):
+        if i == WARMUP_FRAMES:
+            on_warm()
+        started = time.perf_counter()
+        scores, stable = predict_and_smooth(model, smoother, row)
+        metrics.observe('frame_total', time.perf_counter() - started)
+        all_scores.append(scores)
+        stable_labels.append(stable)
+    return all_scores, stable_labels
+
+# --- REPORT ---
+def stage_report(samples):
+    report = {}
+    for stage, values in sorted(samples.items()):
+        ms = np.array(values) * 1000
+        report[stage] = {
+            'count': len(ms),
+            'mean_ms': round(float(ms.mean()), 4),
+            'p50_ms': round(float(np.percentile(ms, 50)), 4),
+            'p95_ms': round(float(np.percentile(ms, 95)), 4),
+            'p99_ms': round(float(np.percentile(ms, 99)), 4),
+            'max_ms': round(float(ms.max()), 4)
+        }
+    return report
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                         stderr=subprocess.DEVNULL, text=True).strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL) != 0
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded frames or landmarks through the frame pipeline")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--frames', help="Directory of recorded frames (JPEG/PNG/WebP)")
+    source.add_argument('--video', help="Video file")
+    source.add_argument('--landmarks', help="Keypoint stream npz (keypoints, optional truth)")
+    source.add_argument('--landmarks-from-dataset', metavar='NPZ',
+                        help="Build a labelled keypoint stream from the dataset store, save it here and replay it")
+    parser.add_argument('--model', default='model.p')
+    parser.add_argument('--artifact', default='model.forest')
+    parser.add_argument('--limit', type=int, default=0, help="Stop after this many frames (0 = all)")
+    parser.add_argument('--client-overlay', action='store_true', help="Pack landmarks instead of draw + encode")
+    parser.add_argument('--roi', action='store_true', help="Crop to the last hand region like ROI_ENABLED=1")
+    parser.add_argument('--save-landmarks', help="Image corpora: write the extracted keypoint stream here")
+    parser.add_argument('--dataset', default='dataset', help="Dataset store for --landmarks-from-dataset")
+    parser.add_argument('--segments', type=int, default=100)
+    parser.add_argument('--segment-frames', type=int, default=30)
+    parser.add_argument('--gap-frames', type=int, default=5)
+    # Smoothing defaults match app.py
+    parser.add_argument('--smoothing', choices=('ema', 'buffer'), default='ema')
+    parser.add_argument('--alpha', type=float, default=0.5)
+    parser.add_argument('--enter', type=float, default=0.5)
+    parser.add_argument('--exit', type=float, default=0.3)
+    parser.add_argument('--margin', type=float, default=0.1)
+    parser.add_argument('--buffer-size', type=int, default=3)
+    parser.add_argument('--out', help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    from model_store import load_model
+    model, info = load_model(args.artifact, args.model)
+    smoother = make_smoother(args.smoothing, args.buffer_size, alpha=args.alpha,
+                             enter=args.enter, exit=args.exit, margin=args.margin)
+
+    samples = metrics.REGISTRY.record_samples()
+    warm = {'rss_mb': peak_rss_mb(), 'at': time.perf_counter()}
+
+    def on_warm():
+        samples.clear()
+        warm['rss_mb'] = peak_rss_mb()
+        warm['at'] = time.perf_counter()
+
+    truth, roi_stats = None, None
+    if args.frames or args.video:
+        from hands_pool import create_hands
+        hands = create_hands(static_image_mode=False)
+        if args.roi:
+            from roi import RoiStats, RoiHands
+            roi_stats = RoiStats()
+            hands = RoiHands(hands, roi_stats)
+        payloads = iter_image_dir(args.frames) if args.frames else iter_video(args.video)
+        scores, stable, keypoints = replay_images(payloads, model, smoother, hands,
+                                                  not args.client_overlay, args.limit, on_warm)
+        if args.save_landmarks:
+            np.savez_compressed(args.save_landmarks, keypoints=np.array(keypoints, dtype=np.float32))
+            print(f"✅ Saved {len(keypoints)} keypoint rows to {args.save_landmarks}", file=sys.stderr)
+        corpus, path = ('frames', args.frames) if args.frames else ('video', args.video)
+    else:
+        if args.landmarks_from_dataset:
+            try:
+                keypoints, truth = build_keypoint_stream(args.segments, args.segment_frames, args.gap_frames,
+                                                         root=args.dataset)
+            except ValueError as e:
+                raise SystemExit(f"Error: {e}")
+            np.savez_compressed(args.landmarks_from_dataset, keypoints=keypoints.astype(np.float32),
+                                truth=np.array(truth))
+            path = args.landmarks_from_dataset
+        else:
+            keypoints, truth = load_landmarks(args.landmarks)
+            path = args.landmarks
+        scores, stable = replay_landmarks(keypoints, model, smoother, args.limit, on_warm)
+        corpus = 'landmarks'
+    elapsed = time.perf_counter() - warm['at']
+
+    if len(stable) <= WARMUP_FRAMES:
+        raise SystemExit(f"Error: need more than {WARMUP_FRAMES} frames, got {len(stable)}")
+    measured = len(stable) - WARMUP_FRAMES
+    busy = sum(samples['frame_total'])
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'corpus': {'type': corpus, 'path': path, 'frames': len(stable), 'warmup_frames': WARMUP_FRAMES},
+        'model': {'source': info['source'], 'version': info.get('version'), 'classes': len(model.classes_)},
+        'config': {'render': None if corpus == 'landmarks' else not args.client_overlay, 'roi': args.roi, 'smoothing': args.smoothing,
+                   'alpha': args.alpha, 'enter': args.enter, 'exit': args.exit, 'margin': args.margin,
+                   'buffer_size': args.buffer_size},
+        # Pipeline work only (excludes reading the corpus), plus wall time for reference
+        'fps': round(measured / busy, 2) if busy else None,
+        'wall_fps': round(measured / elapsed, 2) if elapsed else None,
+        'stages': stage_report(samples),
+        'memory': {'rss_after_warmup_mb': round(warm['rss_mb'], 1), 'peak_rss_mb': round(peak_rss_mb(), 1)},
+        'predictions': {
+            'hand_frames': sum(1 for s in scores if s),
+            'stable_changes': sum(1 for a, b in zip(stable, stable[1:]) if a != b)
+        }
+    }
+    if roi_stats is not None:
+        report['roi'] = roi_stats.snapshot()
+    if truth is not None:
+        truth = truth[:len(stable)]
+        result = evaluate(smoother, scores, truth)
+        report['predictions'].update({
+            'accuracy': round(result['accuracy'], 4),
+            'mean_latency_frames': round(float(np.mean(result['latencies'])), 3) if result['latencies'] else None,
+            'missed_segments': result['missed'],
+            'false_switches': result['false_switches']
+        })
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        print(f"✅ Report written to {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import threading
+
+class FrameBroadcaster:
+    """
+    One producer thread feeding any number of MJPEG viewers.
+    - `source()` returns a generator of (jpeg_bytes, state) pairs; it is started by the
+      first subscriber and closed (releasing the camera) when the last one leaves.
+    - The producer only ever overwrites a single latest-frame slot, so a slow viewer
+      skips frames instead of stalling capture or the other viewers.
+    """
+
+    def __init__(self, source, wait_timeout=5.0):
+        self.source = source
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._subscribers = 0
+        self._running = False
+        self._thread = None
+        self._seq = 0
+        self._jpeg = None
+        self.state = None
+        self._published = 0
+        self._skipped = 0
+        self._starts = 0
+
+    # --- PRODUCER ---
+    def _start_locked(self):
+        previous = self._thread
+        self._running = True
+        self._starts += 1
+        self._thread = threading.Thread(target=self._run, args=(previous,), name="mjpeg-producer", daemon=True)
+        self._thread.start()
+
+    def _run(self, previous):
+        # The previous producer may still be releasing the device
+        if previous is not None:
+            previous.join()
+        frames = self.source()
+        try:
+            for jpeg, state in frames:
+                with self._cond:
+                    self._seq += 1
+                    self._jpeg = jpeg
+                    self.state = state
+                    self._published += 1
+                    self._cond.notify_all()
+                    # Decided under the lock, so a subscriber arriving now starts a new producer
+                    if self._subscribers == 0:
+                        self._running = False
+                        break
+        except Exception as e:
+            print(f"❌ MJPEG producer failed: {e}")
+        finally:
+            frames.close()
+            with self._cond:
+                # A newer producer may already own the slot
+                if self._thread is threading.current_thread():
+                    self._running = False
+                self._cond.notify_all()
+
+    # --- SUBSCRIBERS ---
+    def subscribe(self):
+        """Generator of the newest JPEG for one viewer; ends when the source ends."""
+        with self._cond:
+            self._subscribers += 1
+            if not self._running:
+                self._start_locked()
+            last = self._seq
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq != last or not self._running, self.wait_timeout)
+                    if self._seq == last:
+                        if not self._running:
+                            return
+                        continue
+                    self._skipped += self._seq - last - 1
+                    last, jpeg = self._seq, self._jpeg
+                yield jpeg
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def stats(self):
+        with self._cond:
+            return {
+                'subscribers': self._subscribers,
+                'running': self._running,
+                'published': self._published,
+                'skipped': self._skipped,
+                'starts': self._starts,
+                'state': self.state
+            }
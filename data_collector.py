@@ -1,13 +1,10 @@
 import cv2
 import mediapipe as mp
-import numpy as np
-import pandas as pd
-import os
 import sys
 import argparse
 
 # --- Configuration ---
-DATA_FILE = "data.csv"
+DATASET_DIR = "dataset"  # Sharded store, see dataset_store.py
 FRAMES_PER_CLASS = 500
 # --- TARGETED RETRAINING LIST ---
 
@@ -22,10 +19,15 @@ CLASSES_FULL = [
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--classes', nargs='*', default=[], help='Target classes to record')
+parser.add_argument('--dynamic', action='store_true',
+                    help='Record moving gestures into the motion dataset (repeat the movement while recording)')
 args, _ = parser.parse_known_args()
 
 TARGET_CLASSES = args.classes
 CLASSES = TARGET_CLASSES if TARGET_CLASSES else CLASSES_FULL
+if args.dynamic and not TARGET_CLASSES:
+    print("Error: --dynamic needs the moving gestures to record, e.g. --dynamic --classes Wave")
+    sys.exit(1)
 
 # --- MediaPipe Setup ---
 mp_hands = mp.solutions.hands
@@ -37,34 +39,31 @@ hands = mp_hands.Hands(
 mp_draw = mp.solutions.drawing_utils
 
 from utils import extract_keypoints
+from dataset_store import DatasetStore, LEGACY_CSV
+from motion import MOTION_DATASET_DIR
+
+# Dynamic recordings are continuous sequences for the sequence model (train_model.py --motion)
+store = DatasetStore(MOTION_DATASET_DIR if args.dynamic else DATASET_DIR)
+if not args.dynamic:
+    # Before the first write, so re-recording a class never hides the rest of data.csv
+    imported = store.import_legacy(LEGACY_CSV)
+    if imported is not None:
+        print(f"[IMPORTED] {sum(imported.values())} rows in {len(imported)} classes from {LEGACY_CSV}")
 
 # --- Configuration ---
 
 def save_data(label, new_data):
-    # Columns definition
-    cols = ['label']
-    for hand in ['lh', 'rh']:
-        for i in range(21):
-            cols.extend([f'{hand}_x{i}', f'{hand}_y{i}', f'{hand}_z{i}'])
-            
-    new_df = pd.DataFrame(new_data, columns=cols)
-    
-    if os.path.exists(DATA_FILE):
-        # Read existing data
-        df = pd.read_csv(DATA_FILE)
-        # Remove OLD rows for this specific label (Overwrite logic)
-        df = df[df['label'] != label]
-        # Append NEW data
-        df = pd.concat([df, new_df], ignore_index=True)
-        df.to_csv(DATA_FILE, index=False)
+    # One new shard per recording; only the small index is rewritten (Overwrite logic)
+    if store.save_recording(label, new_data):
         print(f"[UPDATED] Overwrote {label} with {len(new_data)} new frames.")
     else:
-        new_df.to_csv(DATA_FILE, index=False)
         print(f"[CREATED] Saved {len(new_data)} frames for {label}")
 
 def main():
     cap = cv2.VideoCapture(0)
     print("=== Ishara-Connect: 2-Hand Data Collector ===")
+    if args.dynamic:
+        print(f"Dynamic mode: repeat each movement continuously while recording ({store.root}/)")
     
     current_class_index = 0
     recording = False
@@ -90,11 +89,12 @@ def main():
             cv2.putText(frame, f"Target: {target_label} ({current_class_index + 1}/{len(CLASSES)})", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
             
             if recording:
-                cv2.putText(frame, f"REC: {frames_recorded}/{FRAMES_PER_CLASS}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                rec_text = f"REC: {frames_recorded}/{FRAMES_PER_CLASS}" + (" - keep moving" if args.dynamic else "")
+                cv2.putText(frame, rec_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
                 
                 # Extract Data
                 keypoints = extract_keypoints(results)
-                data_buffer.append([target_label] + keypoints.tolist())
+                data_buffer.append(keypoints)
                 frames_recorded += 1
                 
                 if frames_recorded >= FRAMES_PER_CLASS:
@@ -0,0 +1,169 @@
+import argparse
+import datetime
+import json
+import os
+import uuid
+
+import numpy as np
+
+from utils import KEYPOINT_SIZE
+
+# --- LAYOUT ---
+# dataset/index.json        {"format_version": 1, "recordings": {label: {shard, rows, recorded_at}},
+#                            "imported": {csv path: {rows, imported_at}}}
+# dataset/shards/<id>.npy   float32 array of shape (rows, KEYPOINT_SIZE), one per recording
+DATASET_DIR = "dataset"
+INDEX_FILE = "index.json"
+SHARD_DIR = "shards"
+FORMAT_VERSION = 1
+LEGACY_CSV = "data.csv"  # Pre-store dataset, imported once into the store
+
+class DatasetStore:
+    """
+    Append-only keypoint dataset: one .npy shard per recorded class.
+    - Recording a class writes a new shard, then points the index at it; the old
+      shard is deleted only after the index swap, so a crash never loses data.
+    - Nothing is rewritten when another class is recorded.
+    - Shards are memory-mapped on load; only the final training matrix is in RAM.
+    """
+
+    def __init__(self, root=DATASET_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.shard_dir = os.path.join(root, SHARD_DIR)
+
+    # --- INDEX ---
+    def read_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {'format_version': FORMAT_VERSION, 'recordings': {}}
+        if index.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported dataset format {index.get('format_version')}")
+        return index
+
+    def _write_index(self, index):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def recordings(self):
+        """label -> {'shard', 'rows', 'recorded_at'} in recording order."""
+        return self.read_index()['recordings']
+
+    def labels(self):
+        return list(self.recordings())
+
+    def __len__(self):
+        return sum(entry['rows'] for entry in self.recordings().values())
+
+    def imported(self, csv_path):
+        return os.path.normpath(csv_path) in self.read_index().get('imported', {})
+
+    def mark_imported(self, csv_path, rows):
+        os.makedirs(self.root, exist_ok=True)
+        index = self.read_index()
+        index.setdefault('imported', {})[os.path.normpath(csv_path)] = {
+            'rows': int(rows),
+            'imported_at': datetime.datetime.now().isoformat()
+        }
+        self._write_index(index)
+
+    def import_legacy(self, csv_path=LEGACY_CSV):
+        """
+        Import a legacy data.csv once, whatever the store already holds.
+        - Classes already in the store were recorded after data.csv and are kept.
+        - The import is recorded in index.json, so it never runs twice.
+        Call before the first write. Returns {label: rows} imported, or None when
+        there was nothing to import.
+        """
+        if not os.path.exists(csv_path) or self.imported(csv_path):
+            return None
+        counts = migrate_csv(csv_path, self, skip=set(self.labels()))
+        self.mark_imported(csv_path, sum(counts.values()))
+        return counts
+
+    # --- WRITE ---
+    def save_recording(self, label, rows):
+        """Store one class recording (rows of extract_keypoints), replacing any previous one."""
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, KEYPOINT_SIZE)
+        os.makedirs(self.shard_dir, exist_ok=True)
+        shard = f"{uuid.uuid4().hex}.npy"
+        shard_path = os.path.join(self.shard_dir, shard)
+        np.save(shard_path + ".tmp.npy", rows)
+        os.replace(shard_path + ".tmp.npy", shard_path)
+
+        index = self.read_index()
+        previous = index['recordings'].pop(label, None)
+        index['recordings'][label] = {
+            'shard': shard,
+            'rows': len(rows),
+            'recorded_at': datetime.datetime.now().isoformat()
+        }
+        self._write_index(index)
+
+        if previous is not None:
+            old_path = os.path.join(self.shard_dir, previous['shard'])
+            if os.path.exists(old_path):
+                os.remove(old_path)
+        return previous is not None
+
+    # --- READ ---
+    def shard(self, label, mmap=True):
+        entry = self.recordings()[label]
+        return np.load(os.path.join(self.shard_dir, entry['shard']), mmap_mode='r' if mmap else None)
+
+    def iter_shards(self, mmap=True):
+        """(label, float32 array) per recording; arrays are read-only memory maps by default."""
+        for label, entry in self.recordings().items():
+            yield label, np.load(os.path.join(self.shard_dir, entry['shard']), mmap_mode='r' if mmap else None)
+
+    def load(self):
+        """
+        All rows as (X float32 (n, KEYPOINT_SIZE), y object array of labels).
+        X is preallocated once and filled shard by shard from the memory maps.
+        """
+        recordings = self.recordings()
+        total = sum(entry['rows'] for entry in recordings.values())
+        X = np.empty((total, KEYPOINT_SIZE), dtype=np.float32)
+        y = np.empty(total, dtype=object)
+        offset = 0
+        for label, rows in self.iter_shards():
+            X[offset:offset + len(rows)] = rows
+            y[offset:offset + len(rows)] = label
+            offset += len(rows)
+        return X, y
+
+def migrate_csv(csv_path, store, chunksize=50000, skip=()):
+    """
+    Import a legacy data.csv (label + 126 keypoint columns) into the store, one shard
+    per label. Labels in `skip` are left as they are in the store.
+    """
+    import pandas as pd
+    parts = {}
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        labels = chunk['label'].to_numpy()
+        values = chunk.drop('label', axis=1).to_numpy(dtype=np.float32)
+        for label in pd.unique(labels):
+            if label not in skip:
+                parts.setdefault(label, []).append(values[labels == label])
+    for label, chunks in parts.items():
+        store.save_recording(label, np.concatenate(chunks))
+    return {label: sum(len(c) for c in chunks) for label, chunks in parts.items()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the sharded keypoint dataset or import a legacy data.csv")
+    parser.add_argument('--root', default=DATASET_DIR)
+    parser.add_argument('--migrate', metavar='CSV', help="Import rows from a data.csv file")
+    args = parser.parse_args()
+
+    store = DatasetStore(args.root)
+    if args.migrate:
+        counts = migrate_csv(args.migrate, store)
+        store.mark_imported(args.migrate, sum(counts.values()))
+        print(f"[MIGRATED] {sum(counts.values())} rows in {len(counts)} classes from {args.migrate}")
+    for label, entry in store.recordings().items():
+        print(f"{label:>12}: {entry['rows']:6d} rows  ({entry['recorded_at']})")
+    print(f"Total: {len(store)} rows")
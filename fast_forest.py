@@ -0,0 +1,101 @@
+import numpy as np
+
+class CompiledForest:
+    """
+    A fitted RandomForestClassifier flattened into contiguous NumPy arrays.
+    - All trees share one node table (feature, threshold, left, right, value).
+    - Leaves point to themselves, so every row walks exactly `max_depth` steps
+      and all trees are traversed together with vectorized indexing.
+    - predict/predict_proba match the sklearn forest exactly, without the
+      joblib dispatch and input validation paid on every single-row call.
+    """
+
+    def __init__(self, classes, feature, threshold, left, right, value, roots, max_depth, n_features):
+        self.classes_ = np.asarray(classes)
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.n_estimators = len(roots)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            index = np.arange(offset, offset + n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(np.where(is_leaf, index, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, index, tree.children_right + offset).astype(np.int32))
+
+            # Same per-leaf normalization as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :forest.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            classes=forest.classes_,
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            n_features=forest.n_features_in_
+        )
+
+    def apply(self, X):
+        """Leaf index of every row in every tree, shape (n_rows, n_trees)."""
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.repeat(self.roots[np.newaxis, :], X.shape[0], axis=0)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        # Summing over the (non-contiguous) tree axis adds trees in order, like sklearn
+        proba = self.value[self.apply(X)].sum(axis=1)
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+def compile_model(model):
+    """
+    Compile a fitted single-output forest (RandomForestClassifier, ExtraTreesClassifier)
+    into a CompiledForest, pass anything else through.
+    - Only plain forests average unweighted trees over all features. Bagging
+      (per-estimator feature subsets) and AdaBoost (estimator weights) also have
+      `estimators_` with a `tree_`, but compiling them would change predictions.
+    """
+    from sklearn.ensemble._forest import ForestClassifier
+
+    if not isinstance(model, ForestClassifier):
+        return model
+    if not getattr(model, 'estimators_', None):
+        return model
+    if getattr(model, 'n_outputs_', 1) != 1:
+        return model
+    return CompiledForest.from_sklearn(model)
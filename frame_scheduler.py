@@ -0,0 +1,186 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils import extract_keypoints
+from pipeline import classify_rows
+from metrics import span, observe
+
+def native_call():
+    """
+    How the scheduler runs Hands.process, a blocking C call.
+    - Under eventlet monkey patching (the Procfile's gunicorn eventlet worker) the
+      executor threads are green threads on one OS thread, so the calls would run
+      one after another. They are handed to eventlet.tpool's OS threads instead.
+    - Otherwise the executor threads are real and call it directly.
+    """
+    try:
+        from eventlet import patcher, tpool
+    except ImportError:
+        return None
+    return tpool.execute if patcher.is_monkey_patched('thread') else None
+
+class FrameJob:
+    """
+    One frame submitted by a socket session, filled in by the scheduler.
+    - Image frames carry `frame_rgb` and go through hand landmarking.
+    - Landmark-only frames carry precomputed `keypoints` and skip straight to predict.
+    """
+
+    def __init__(self, sid, frame_rgb=None, keypoints=None):
+        self.sid = sid
+        self.frame_rgb = frame_rgb
+        self.enqueued_at = time.perf_counter()
+        self.results = None
+        self.keypoints = keypoints
+        self.prediction = None
+        self.confidence = None
+        self.proba = None
+        self.classes = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+class FrameScheduler:
+    """
+    Micro-batches frames from all socket sessions.
+    - Collects pending frames for up to `window` seconds or `max_batch` frames.
+    - Runs hand landmarking for the batch concurrently on a pool of Hands instances.
+    - Classifies every frame that has hands with a single vectorized predict call.
+    - `get_model` is called once per batch so a swapped model applies to the next batch.
+    - Under eventlet, Hands.process runs in eventlet.tpool (see native_call); the
+      pool lease and everything else stays on the green threads.
+    """
+
+    def __init__(self, hands_pool, get_model, window=0.008, max_batch=8):
+        self.hands_pool = hands_pool
+        self.get_model = get_model
+        self.window = window
+        self.max_batch = max(1, int(max_batch))
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=hands_pool.size)
+        self._native_call = native_call()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = collections.Counter()
+        self._frames = 0
+        self._in_flight = 0
+        self._queue_delay_total = 0.0
+        self._queue_delay_max = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, sid, frame_rgb):
+        job = FrameJob(sid, frame_rgb=frame_rgb)
+        self._queue.put(job)
+        return job
+
+    def submit_keypoints(self, sid, keypoints):
+        job = FrameJob(sid, keypoints=keypoints)
+        self._queue.put(job)
+        return job
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with self._stats_lock:
+                self._in_flight = len(batch)
+            try:
+                self._process(batch)
+            except Exception as e:
+                print(f"❌ Scheduler batch failed: {e}")
+            finally:
+                with self._stats_lock:
+                    self._in_flight = 0
+                for job in batch:
+                    job._done.set()
+
+    def _landmark(self, job):
+        with self.hands_pool.session(job.sid) as hands:
+            with span('hands'):
+                if self._native_call is not None:
+                    job.results = self._native_call(hands.process, job.frame_rgb)
+                else:
+                    job.results = hands.process(job.frame_rgb)
+        if job.results.multi_hand_landmarks:
+            with span('keypoints'):
+                job.keypoints = extract_keypoints(job.results)
+
+    def _process(self, batch):
+        started = time.perf_counter()
+        self._record(batch, started)
+
+        # 1. Landmarks for every image frame in parallel
+        images = [job for job in batch if job.frame_rgb is not None]
+        if images:
+            list(self._executor.map(self._landmark, images))
+
+        # 2. One predict call over the stacked keypoint rows
+        ready = [job for job in batch if job.keypoints is not None]
+        model = self.get_model()
+        if not ready or model is None:
+            return
+        try:
+            rows = np.vstack([job.keypoints for job in ready])
+            with span('predict'):
+                predictions, confidences, proba = classify_rows(model, rows)
+            for job, prediction, confidence, row in zip(ready, predictions, confidences, proba):
+                job.prediction = prediction
+                job.confidence = confidence
+                job.proba = row
+                job.classes = getattr(model, 'classes_', None)
+        except Exception as e:
+            print(f"⚠️ Predict fail: {e}")
+
+    def _record(self, batch, started):
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._frames += len(batch)
+            for job in batch:
+                delay = started - job.enqueued_at
+                observe('scheduler_queue', delay)
+                self._queue_delay_total += delay
+                self._queue_delay_max = max(self._queue_delay_max, delay)
+
+    def pending(self):
+        """Frames waiting for the next batch."""
+        return self._queue.qsize()
+
+    def in_flight(self):
+        """Frames in the batch being processed."""
+        with self._stats_lock:
+            return self._in_flight
+
+    def backlog(self):
+        """Frames a new submission has to wait for: the running batch plus the queue."""
+        return self.in_flight() + self.pending()
+
+    def stats(self):
+        """Achieved batch sizes and queueing delay since startup."""
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                'batches': batches,
+                'frames': self._frames,
+                'avg_batch_size': self._frames / batches if batches else 0.0,
+                'batch_size_counts': {str(k): v for k, v in sorted(self._batch_sizes.items())},
+                'avg_queue_delay_ms': 1000 * self._queue_delay_total / self._frames if self._frames else 0.0,
+                'max_queue_delay_ms': 1000 * self._queue_delay_max,
+                'window_ms': 1000 * self.window,
+                'native_threads': self._native_call is not None,
+                'max_batch': self.max_batch
+            }
@@ -1,15 +1,25 @@
+import argparse
 import asyncio
-import edge_tts
+import hashlib
+import importlib
+import json
 import os
+import tempfile
+
+from utterances import audio_location
 
 AUDIO_DIR = "static/audio"
 RATE = "-15%"  # Slightly slower for clarity
 PITCH = "+0Hz"
+CONCURRENCY = 4  # Parallel synthesis requests
+MANIFEST_FILE = "premium_manifest.json"  # Content hash of every file built into AUDIO_DIR (kept out of static/)
+OFFLINE_BACKENDS = {'stub'}  # Backends whose output must never land in AUDIO_DIR
 
 # --- VOICES ---
 VOICE_BENGALI = "bn-IN-TanishaaNeural"
 VOICE_HINDI = "hi-IN-SwaraNeural"
 VOICE_ENGLISH = "en-IN-NeerjaNeural"
+VOICES = {'bengali': VOICE_BENGALI, 'hindi': VOICE_HINDI, 'english': VOICE_ENGLISH}
 
 # --- MAPS ---
 BENGALI_MAP = {
@@ -70,55 +80,177 @@ ENGLISH_POLITE_MAP = {
     "Friend": "You are a good friend", "Mother": "Mother", "Book": "I would like to read this book", "Tea": "Could I please have a cup of tea?", "Name": "My name is", "Happy": "I am delighted"
 }
 
-async def generate_for_map(map_data, voice, folder_name):
-    # Ensure folder exists
-    target_dir = os.path.join(AUDIO_DIR, folder_name)
-    if not os.path.exists(target_dir):
-        os.makedirs(target_dir)
-        
-    print(f"\n--- Processing: {folder_name} ({voice}) ---")
-    
-    for gesture, text in map_data.items():
-        if not text: continue
-        
-        # Consistent Filename: "Please" -> "please.mp3"
-        filename_base = gesture.lower().replace(' ', '_')
-        if folder_name.endswith('_polite'):
-             filename_base += "_polite"
-        
-        filename = f"{filename_base}.mp3"
-        filepath = os.path.join(target_dir, filename)
-        
-        # print(f"Generating: {gesture} -> {filepath}")
-        
-        if os.path.exists(filepath):
-            print(f"Skipping (Exists): {filename}")
-            continue
-            
-        try:
-            communicate = edge_tts.Communicate(text, voice, rate=RATE, pitch=PITCH)
-            await communicate.save(filepath)
-            print(f"✅ Generated: {filename}")
-        except Exception as e:
-            print(f"❌ Error generating {gesture}: {e}")
-
-async def main():
-    if not os.path.exists(AUDIO_DIR):
-        os.makedirs(AUDIO_DIR)
-        
-    # batch 1: Bengali
-    await generate_for_map(BENGALI_MAP, VOICE_BENGALI, "bengali")
-    await generate_for_map(BENGALI_POLITE_MAP, VOICE_BENGALI, "bengali_polite")
-    
-    # batch 2: Hindi
-    await generate_for_map(HINDI_MAP, VOICE_HINDI, "hindi")
-    await generate_for_map(HINDI_POLITE_MAP, VOICE_HINDI, "hindi_polite")
-    
-    # batch 3: English
-    await generate_for_map(ENGLISH_MAP, VOICE_ENGLISH, "english")
-    await generate_for_map(ENGLISH_POLITE_MAP, VOICE_ENGLISH, "english_polite")
-    
-    print("\n🎉 All Audio Assets Generated Successfully!")
+INLINE_MAPS = {
+    ('bengali', False): BENGALI_MAP, ('bengali', True): BENGALI_POLITE_MAP,
+    ('hindi', False): HINDI_MAP, ('hindi', True): HINDI_POLITE_MAP,
+    ('english', False): ENGLISH_MAP, ('english', True): ENGLISH_POLITE_MAP
+}
+
+# --- BACKENDS ---
+# A backend is `async def synthesize(text, voice, rate, pitch, path)` that writes an mp3 to path.
+async def edge_backend(text, voice, rate, pitch, path):
+    import edge_tts
+    communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
+    await communicate.save(path)
+
+async def stub_backend(text, voice, rate, pitch, path):
+    """Offline synthesizer for testing the build: writes a deterministic placeholder file."""
+    await asyncio.sleep(0.01)
+    with open(path, "wb") as f:
+        f.write(b"ID3STUB\n" + json.dumps([text, voice, rate, pitch], ensure_ascii=False).encode("utf-8"))
+
+BACKENDS = {'edge': edge_backend, 'stub': stub_backend}
+
+def resolve_backend(name):
+    """Built-in backend name, or 'package.module:function' for a custom synthesizer."""
+    if name in BACKENDS:
+        return BACKENDS[name]
+    module_name, _, attr = name.partition(':')
+    if not attr:
+        raise ValueError(f"Unknown TTS backend '{name}' (use {', '.join(BACKENDS)} or module:function)")
+    return getattr(importlib.import_module(module_name), attr)
+
+# --- PHRASES ---
+def load_phrases(source):
+    """
+    (lang, polite) -> {gesture: text} from the inline maps above, or from
+    translations/*.json (the same file the server reads) with source='translations'.
+    """
+    if source == 'inline':
+        return INLINE_MAPS
+    phrases = {}
+    for lang in VOICES:
+        with open(f"translations/{lang}.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        phrases[(lang, False)] = data.get("standard", {})
+        phrases[(lang, True)] = data.get("polite", {})
+    return phrases
+
+def content_hash(text, voice, rate, pitch, backend):
+    payload = json.dumps([text, voice, rate, pitch, backend], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def plan_jobs(phrases, backend, out_dir=AUDIO_DIR, rate=RATE, pitch=PITCH):
+    """One job per non-empty phrase: (path, text, voice, hash)."""
+    jobs = []
+    for (lang, polite), map_data in phrases.items():
+        voice = VOICES[lang]
+        for gesture, text in map_data.items():
+            if not text:
+                continue
+            path = audio_location(lang, polite, gesture, out_dir)
+            jobs.append((path, text, voice, content_hash(text, voice, rate, pitch, backend)))
+    return jobs
+
+# --- MANIFEST ---
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def stale_jobs(jobs, manifest, force=False):
+    """Jobs whose file is missing or was built from different text/voice/rate/pitch/backend."""
+    if force:
+        return list(jobs)
+    return [job for job in jobs if not os.path.exists(job[0]) or manifest.get(job[0]) != job[3]]
+
+# --- BUILD ---
+async def build(jobs, synthesize, manifest, concurrency=CONCURRENCY, rate=RATE, pitch=PITCH):
+    """
+    Synthesize jobs concurrently (at most `concurrency` in flight).
+    - Each file is written to a temp path and renamed, so a failed or interrupted
+      request never leaves a truncated mp3 behind.
+    - The manifest entry is updated only after the rename.
+    Returns the number of failed jobs.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(path, text, voice, digest):
+        async with semaphore:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".part"
+            try:
+                await synthesize(text, voice, rate, pitch, tmp_path)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                print(f"❌ Error generating {path}: {e}")
+                return False
+            manifest[path] = digest
+            print(f"✅ Generated: {path}")
+            return True
+
+    results = await asyncio.gather(*(run(*job) for job in jobs))
+    return results.count(False)
+
+def output_paths(backend, out_dir=None):
+    """
+    (audio dir, manifest path) for a build.
+    - Served clips go to AUDIO_DIR with MANIFEST_FILE at the project root.
+    - Offline backends write placeholders, so they are refused for AUDIO_DIR and
+      default to a fresh temp dir; any other --out keeps its manifest inside it.
+    """
+    if out_dir is None:
+        if backend not in OFFLINE_BACKENDS:
+            return AUDIO_DIR, MANIFEST_FILE
+        out_dir = tempfile.mkdtemp(prefix="premium_audio_")
+    if os.path.abspath(out_dir) == os.path.abspath(AUDIO_DIR):
+        if backend in OFFLINE_BACKENDS:
+            raise ValueError(f"The {backend} backend writes placeholder files; pass an --out outside {AUDIO_DIR}")
+        return AUDIO_DIR, MANIFEST_FILE
+    return out_dir, os.path.join(out_dir, "premium_manifest.json")
+
+async def main(args):
+    out_dir, manifest_file = args.out, args.manifest
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = plan_jobs(load_phrases(args.source), args.backend, out_dir)
+    manifest = load_manifest(manifest_file)
+
+    if args.adopt:
+        # Trust files generated before the manifest existed instead of rebuilding them
+        for path, _, _, digest in jobs:
+            if os.path.exists(path) and path not in manifest:
+                manifest[path] = digest
+        save_manifest(manifest, manifest_file)
+
+    todo = stale_jobs(jobs, manifest, args.force)
+    print(f"--- {len(todo)} of {len(jobs)} phrases to build ({args.source}, {args.backend} -> {out_dir}) ---")
+    if args.dry_run:
+        for path, text, voice, _ in todo:
+            print(f"  {path}  [{voice}] {text}")
+        return
+
+    try:
+        failed = await build(todo, resolve_backend(args.backend), manifest, args.concurrency)
+    finally:
+        save_manifest(manifest, manifest_file)
+    if failed:
+        print(f"\n⚠️ {failed} phrases failed; re-run to retry them.")
+    else:
+        print("\n🎉 All Audio Assets Generated Successfully!")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Build premium (edge-tts) audio for every phrase, rebuilding only what changed")
+    parser.add_argument('--source', choices=('inline', 'translations'), default='inline',
+                        help="Phrase source: the maps in this file or translations/*.json")
+    parser.add_argument('--backend', default='edge', help="edge, stub, or module:function")
+    parser.add_argument('--out', help=f"Output directory (default {AUDIO_DIR}; a temp dir for the stub backend)")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--force', action='store_true', help="Rebuild every phrase")
+    parser.add_argument('--adopt', action='store_true', help="Record existing files as up to date")
+    parser.add_argument('--dry-run', action='store_true', help="List what would be built")
+    args = parser.parse_args()
+    try:
+        args.out, args.manifest = output_paths(args.backend, args.out)
+    except ValueError as e:
+        parser.error(str(e))
+    asyncio.run(main(args))
@@ -0,0 +1,142 @@
+import collections
+import contextlib
+import threading
+import time
+import mediapipe as mp
+
+from metrics import observe
+
+mp_hands = mp.solutions.hands
+
+def create_hands(static_image_mode=True):
+    """Build a Hands instance with the settings used across the app."""
+    return mp_hands.Hands(
+        static_image_mode=static_image_mode,
+        model_complexity=0,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+        max_num_hands=2
+    )
+
+_BUILD = object()  # _take_instance_locked: a slot is reserved, build the instance unlocked
+
+class _Lease:
+    def __init__(self, hands):
+        self.hands = hands
+        self.lock = threading.Lock()
+        self.busy = 0
+
+class SessionHandsPool:
+    """
+    Tracking-mode Hands instances leased to individual socket sessions.
+    - Each session keeps its own instance (static_image_mode=False), so the landmark
+      tracker follows the hand between frames instead of re-running the palm detector.
+    - Sessions lease on their first frame, not on connect, so an open tab that sends
+      nothing never takes an instance.
+    - At most `size` instances exist. When the pool is full, the least recently used
+      idle session is evicted and its instance recycled; it re-leases on its next frame.
+    - New instances (a MediaPipe graph build) are created outside the pool lock, so
+      other sessions' frames keep flowing meanwhile.
+    - Instances returned on disconnect are reset and kept for the next session.
+    - `factory` builds new instances (anything with process()/reset(), e.g. RoiHands).
+    """
+
+    def __init__(self, size=8, factory=None):
+        self.size = max(1, int(size))
+        self.factory = factory or (lambda: create_hands(static_image_mode=False))
+        self._cond = threading.Condition()
+        self._leases = collections.OrderedDict()
+        self._spare = []
+        self._created = 0
+        self._evictions = 0
+
+    def release(self, sid):
+        with self._cond:
+            lease = self._leases.pop(sid, None)
+            if lease is not None and lease.busy == 0:
+                self._recycle_locked(lease.hands)
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def session(self, sid):
+        lease = self._acquire(sid)
+        try:
+            # Two frames of one session never run on its tracker at the same time
+            waited = time.perf_counter()
+            with lease.lock:
+                observe('hands_lock_wait', time.perf_counter() - waited)
+                yield lease.hands
+        finally:
+            with self._cond:
+                lease.busy -= 1
+                # Released while a frame was in flight: recycle once it finishes
+                if lease.busy == 0 and self._leases.get(sid) is not lease:
+                    self._recycle_locked(lease.hands)
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'leased': len(self._leases),
+                'spare': len(self._spare),
+                'evictions': self._evictions
+            }
+
+    def _acquire(self, sid):
+        """The session's lease, marked busy; leases (and if needed builds) an instance first."""
+        with self._cond:
+            while True:
+                lease = self._leases.get(sid)
+                if lease is not None:
+                    self._leases.move_to_end(sid)
+                    lease.busy += 1
+                    return lease
+                hands = self._take_instance_locked()
+                if hands is _BUILD:
+                    break
+                if hands is not None:
+                    lease = self._leases[sid] = _Lease(hands)
+                    lease.busy += 1
+                    return lease
+                self._cond.wait()
+
+        # A slot was reserved for a new instance: build it without holding the lock
+        try:
+            hands = self.factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            lease = self._leases.get(sid)
+            if lease is None:
+                lease = self._leases[sid] = _Lease(hands)
+            else:
+                # Another frame of this session leased meanwhile; keep the new one spare
+                self._spare.append(hands)
+            lease.busy += 1
+            self._cond.notify_all()
+            return lease
+
+    def _take_instance_locked(self):
+        """A spare or evicted instance, _BUILD after reserving a slot for a new one, or None."""
+        if self._spare:
+            return self._spare.pop()
+        if self._created < self.size:
+            self._created += 1
+            return _BUILD
+        # Pool is full: evict the least recently used idle session
+        for sid, lease in self._leases.items():
+            if lease.busy == 0:
+                del self._leases[sid]
+                self._evictions += 1
+                print(f"♻️ Evicted idle hand tracker for {sid}")
+                lease.hands.reset()
+                return lease.hands
+        return None
+
+    def _recycle_locked(self, hands):
+        hands.reset()
+        self._spare.append(hands)
@@ -0,0 +1,285 @@
+import multiprocessing
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
+
+import numpy as np
+
+MAX_FRAME_BYTES = 4 * 1024 * 1024  # Per-worker shared buffer for one encoded frame
+MONITOR_INTERVAL = 1.0
+WORKER_START_TIMEOUT = 60.0  # Spawn, imports, MediaPipe graph and model load; frames have their own timeout
+
+def _worker_main(conn, in_name, out_name, artifact_path, pickle_path, hands_pool_size, roi=None):
+    """
+    Inference worker process loop.
+    - Owns its own tracking-mode Hands instances (one per routed session) and model.
+    - Reads encoded frames from the shared input buffer and writes the annotated
+      JPEG to the shared output buffer; only small metadata crosses the pipe.
+    - `roi` (RoiHands options) enables region-of-interest cropping; its counters
+      ride along with every reply.
+    - Sends ('ready',) once set up, before reading any message.
+    """
+    from hands_pool import SessionHandsPool
+    from model_store import load_model
+    from pipeline import prepare_frame, classify_rows, finish_frame
+    from utils import extract_keypoints
+    from roi import RoiStats, roi_factory
+    from overlay import HandOverlay
+
+    def load():
+        try:
+            return load_model(artifact_path, pickle_path)[0]
+        except Exception as e:
+            print(f"❌ [Worker] Error loading model: {e}")
+            return None
+
+    # The server process owns the segments and unlinks them on shutdown
+    in_shm = shared_memory.SharedMemory(name=in_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    roi_stats = RoiStats() if roi is not None else None
+    hands_pool = SessionHandsPool(hands_pool_size, roi_factory(roi_stats, **roi) if roi is not None else None)
+    model = load()
+    overlays = {}  # sid -> HandOverlay, so a still hand's overlay is reused across frames
+    conn.send(('ready',))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        op = message[0]
+
+        if op == 'frame':
+            _, sid, nbytes, render = message
+            try:
+                frame, frame_rgb = prepare_frame(in_shm.buf[:nbytes])
+                with hands_pool.session(sid) as hands:
+                    results = hands.process(frame_rgb)
+                keypoints = prediction = confidence = proba = classes = None
+                if results.multi_hand_landmarks:
+                    keypoints = extract_keypoints(results)
+                    if model is not None:
+                        predictions, confidences, probas = classify_rows(model, keypoints[np.newaxis, :])
+                        prediction, confidence, proba = predictions[0], confidences[0], probas[0]
+                        classes = getattr(model, 'classes_', None)
+                overlay = overlays.setdefault(sid, HandOverlay()) if render else None
+                outcome = finish_frame(frame, results, prediction, confidence, keypoints, render, proba, classes,
+                                       overlay)
+                jpeg_len = 0
+                if outcome.jpeg is not None:
+                    jpeg_len = len(outcome.jpeg)
+                    if jpeg_len > out_shm.size:
+                        raise ValueError(f"encoded frame of {jpeg_len} bytes exceeds the shared buffer")
+                    np.frombuffer(out_shm.buf, np.uint8, jpeg_len)[:] = outcome.jpeg.ravel()
+                    outcome.jpeg = None
+                conn.send(('ok', outcome, jpeg_len, roi_stats and roi_stats.snapshot()))
+            except Exception as e:
+                conn.send(('error', str(e), 0, None))
+        elif op == 'release':
+            hands_pool.release(message[1])
+            overlays.pop(message[1], None)
+        elif op == 'reload':
+            model = load() or model
+        elif op == 'stop':
+            break
+
+    in_shm.close()
+    out_shm.close()
+
+class _Worker:
+    """Server-side handle of one worker process and its pair of shared buffers."""
+
+    def __init__(self, index, ctx, artifact_path, pickle_path, hands_pool_size, roi=None):
+        self.index = index
+        self.ctx = ctx
+        self.args = (artifact_path, pickle_path, hands_pool_size, roi)
+        self.in_shm = shared_memory.SharedMemory(create=True, size=MAX_FRAME_BYTES)
+        self.out_shm = shared_memory.SharedMemory(create=True, size=MAX_FRAME_BYTES)
+        self.lock = threading.Lock()       # One frame in flight per worker
+        self.send_lock = threading.Lock()  # Pipe writes from several threads
+        self.frames = 0
+        self.errors = 0
+        self.restarts = 0
+        self.roi = None  # Latest RoiStats snapshot reported by the process
+        self.process = None
+        self.conn = None
+        self.ready = False
+        self.start()
+
+    def start(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.in_shm.name, self.out_shm.name) + self.args,
+            name=f"inference-worker-{self.index}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.ready = False
+
+    def wait_ready(self, timeout=WORKER_START_TIMEOUT):
+        """
+        Wait for a fresh process to report ('ready',), so its startup is never
+        charged to a frame's timeout. Restarts it and returns False if it never does.
+        """
+        if self.ready:
+            return True
+        if not self.conn.poll(timeout):
+            self.restart("did not start in time")
+            return False
+        try:
+            self.conn.recv()
+        except (EOFError, OSError):
+            self.restart("exited during startup")
+            return False
+        self.ready = True
+        return True
+
+    def restart(self, reason):
+        print(f"♻️ Restarting inference worker {self.index}: {reason}")
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1.0)
+        self.conn.close()
+        self.restarts += 1
+        self.start()
+
+    def send(self, message):
+        try:
+            with self.send_lock:
+                self.conn.send(message)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Inference worker {self.index} unreachable: {e}")
+
+    def process_frame(self, sid, data, render, timeout):
+        with self.lock:
+            if not self.process.is_alive():
+                self.restart("process exited")
+            if not self.wait_ready():
+                return None
+            nbytes = len(data)
+            if nbytes > self.in_shm.size:
+                raise ValueError(f"frame of {nbytes} bytes exceeds the shared buffer")
+            self.in_shm.buf[:nbytes] = data
+            self.send(('frame', sid, nbytes, render))
+
+            # Blocks until the reply arrives; a crashed worker closes its end of the
+            # pipe, which wakes the poll and fails recv with EOFError
+            if not self.conn.poll(timeout):
+                self.restart("timed out")
+                return None
+            try:
+                status, outcome, jpeg_len, roi = self.conn.recv()
+            except (EOFError, OSError):
+                self.restart("crashed while processing a frame")
+                return None
+            if roi is not None:
+                self.roi = roi
+            if status != 'ok':
+                self.errors += 1
+                print(f"⚠️ Inference worker {self.index} error: {outcome}")
+                return None
+            if jpeg_len:
+                outcome.jpeg = bytes(self.out_shm.buf[:jpeg_len])
+            self.frames += 1
+            return outcome
+
+    def close(self):
+        self.send(('stop',))
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.kill()
+        for shm in (self.in_shm, self.out_shm):
+            shm.close()
+            shm.unlink()
+
+class InferenceWorkerPool:
+    """
+    Runs the video frame pipeline (decode, Hands, keypoints, predict, draw, encode)
+    in N separate processes, outside the socket process and its GIL.
+    - Sessions are routed to a fixed worker so their hand tracker state stays put.
+    - Frames travel through per-worker shared memory buffers, not pickled bytes.
+    - A worker that crashes or hangs is restarted; the frame it held is dropped.
+      Idle workers that die are restarted by a monitor thread.
+    - A (re)started worker's first frame waits for it to report ready (up to
+      WORKER_START_TIMEOUT) before the per-frame `timeout` starts counting.
+    - `sleep` should be the server's cooperative sleep (socketio.sleep under eventlet);
+      it paces the monitor. Frame replies are awaited with a blocking conn.poll,
+      which eventlet's monkey patching makes cooperative.
+    """
+
+    def __init__(self, size, artifact_path, pickle_path, hands_pool_size=8, timeout=5.0, sleep=time.sleep, roi=None):
+        # spawn: each worker starts a clean interpreter with its own MediaPipe graph
+        ctx = multiprocessing.get_context('spawn')
+        self.timeout = timeout
+        self.sleep = sleep
+        self.workers = [
+            _Worker(i, ctx, artifact_path, pickle_path, hands_pool_size, roi)
+            for i in range(max(1, int(size)))
+        ]
+        self._closed = False
+        self._count_lock = threading.Lock()
+        self._in_flight = 0
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    def _monitor(self):
+        while not self._closed:
+            self.sleep(MONITOR_INTERVAL)
+            for worker in self.workers:
+                # Busy workers are checked by the frame they are processing
+                if not self._closed and worker.lock.acquire(blocking=False):
+                    try:
+                        if not worker.process.is_alive():
+                            worker.restart("process exited")
+                    finally:
+                        worker.lock.release()
+
+    def _route(self, sid):
+        return self.workers[zlib.crc32(sid.encode('utf-8')) % len(self.workers)]
+
+    def process(self, sid, data, render=True):
+        """Process one encoded frame. Returns a FrameOutcome, or None if it was dropped."""
+        with self._count_lock:
+            self._in_flight += 1
+        try:
+            return self._route(sid).process_frame(sid, data, render, self.timeout)
+        finally:
+            with self._count_lock:
+                self._in_flight -= 1
+
+    def release(self, sid):
+        self._route(sid).send(('release', sid))
+
+    def reload_model(self):
+        for worker in self.workers:
+            worker.send(('reload',))
+
+    def busy(self):
+        """Workers currently holding a frame."""
+        return sum(worker.lock.locked() for worker in self.workers)
+
+    def in_flight(self):
+        """Frames being processed or waiting for their worker."""
+        with self._count_lock:
+            return self._in_flight
+
+    def stats(self):
+        return [{
+            'worker': worker.index,
+            'pid': worker.process.pid,
+            'alive': worker.process.is_alive(),
+            'ready': worker.ready,
+            'frames': worker.frames,
+            'errors': worker.errors,
+            'restarts': worker.restarts,
+            'roi': worker.roi
+        } for worker in self.workers]
+
+    def close(self):
+        self._closed = True
+        for worker in self.workers:
+            with worker.lock:
+                worker.close()
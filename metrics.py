@@ -0,0 +1,187 @@
+import bisect
+import collections
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+PREFIX = "ishara_"
+# Histogram bucket upper bounds in seconds: 50us doubling up to ~6.5s
+BUCKETS = tuple(0.00005 * 2 ** k for k in range(18))
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect plus three additions."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q, snapshot=None):
+        """Estimate from the buckets, interpolating linearly inside the matching bucket."""
+        counts, _, count = snapshot or self.snapshot()
+        if count == 0:
+            return None
+        rank = q * count
+        cumulative = 0
+        for i, n in enumerate(counts):
+            if n and cumulative + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.bounds[-1]
+
+class _Span:
+    __slots__ = ('registry', 'stage', 'start')
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+class Registry:
+    """
+    Process-wide pipeline metrics.
+    - Per-stage latency histograms fed by span()/observe().
+    - Counters incremented with inc(name, **labels).
+    - Collectors: callables sampled only when /metrics is scraped, for values the app
+      already tracks elsewhere (session counts, queue stats), so the hot path pays nothing.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self._collectors = []
+        self.samples = None  # {stage: [seconds]} once record_samples() is called
+
+    def record_samples(self):
+        """Also keep every raw observation, for offline benchmarks that want exact percentiles."""
+        self.enabled = True
+        self.samples = collections.defaultdict(list)
+        return self.samples
+
+    # --- HOT PATH ---
+    def span(self, stage):
+        return _Span(self, stage) if self.enabled else _NO_SPAN
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+        if self.samples is not None:
+            self.samples[stage].append(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # --- SCRAPE-TIME VALUES ---
+    def collector(self, name, kind, help_text, fn, label=None):
+        """Register fn() -> number, or {label value: number} when `label` is given."""
+        self._collectors.append((name, kind, help_text, fn, label))
+
+    # --- EXPORT ---
+    def stage_summary(self):
+        """{stage: {count, p50_ms, p95_ms, p99_ms}} for the JSON /stats endpoint."""
+        summary = {}
+        for stage, histogram in sorted(self._stages.items()):
+            snapshot = histogram.snapshot()
+            summary[stage] = {'count': snapshot[2]}
+            for q in (0.5, 0.95, 0.99):
+                value = histogram.quantile(q, snapshot)
+                summary[stage][f"p{int(q * 100)}_ms"] = None if value is None else round(value * 1000, 3)
+        return summary
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            f"# HELP {PREFIX}stage_seconds Time spent in each frame pipeline stage.",
+            f"# TYPE {PREFIX}stage_seconds histogram"
+        ]
+        for stage, histogram in sorted(self._stages.items()):
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, n in zip(histogram.bounds, counts):
+                cumulative += n
+                lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{stage}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{PREFIX}stage_seconds_sum{{stage="{stage}"}} {total:.9f}')
+            lines.append(f'{PREFIX}stage_seconds_count{{stage="{stage}"}} {count}')
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+
+        for name, kind, help_text, fn, label in self._collectors:
+            try:
+                value = fn()
+            except Exception as e:
+                print(f"⚠️ Metrics collector {name} failed: {e}")
+                continue
+            lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+            if label is None:
+                lines.append(f"{PREFIX}{name} {value}")
+            else:
+                for key, item in sorted(value.items(), key=lambda kv: str(kv[0])):
+                    lines.append(f"{PREFIX}{name}{_labels(((label, key),))} {item}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+REGISTRY = Registry(METRICS_ENABLED)
+span = REGISTRY.span
+observe = REGISTRY.observe
+inc = REGISTRY.inc
@@ -0,0 +1,187 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import struct
+
+import numpy as np
+
+from fast_forest import CompiledForest, compile_model
+
+# --- ARTIFACT LAYOUT ---
+# [8s magic][<I header length][JSON header][padding][array blobs, each 64-byte aligned]
+# The header records classes, training metadata and each blob's dtype/shape/offset
+# (offsets are relative to the first blob), so arrays can be np.memmap'd in place.
+# `source_pickle` links the artifact to the model.p it was exported from.
+ARTIFACT_MAGIC = b"ISHFRST\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+FOREST_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+METADATA_KEYS = ('version', 'trained_at', 'accuracy', 'window')  # window: motion models only
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _to_json(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def pickle_link(pickle_path):
+    """Identity of the pickle an artifact is exported from: size, mtime and content digest."""
+    st = os.stat(pickle_path)
+    return {'file': os.path.basename(pickle_path), 'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns, 'sha256': _file_digest(pickle_path)}
+
+def artifact_matches(header, pickle_path):
+    """
+    Whether an artifact was exported from the pickle currently at `pickle_path`.
+    - Same size and mtime: trusted without reading the pickle.
+    - Same size, other mtime (copied, restored, touched): the content digest decides.
+    - Artifacts without a link (older exports) never match.
+    """
+    link = header.get('source_pickle')
+    if not link:
+        return False
+    st = os.stat(pickle_path)
+    if st.st_size != link['size']:
+        return False
+    if st.st_mtime_ns == link['mtime_ns']:
+        return True
+    return _file_digest(pickle_path) == link['sha256']
+
+def save_forest_artifact(path, forest, metadata=None, source_pickle=None):
+    """
+    Write a CompiledForest and its training metadata; the file is replaced atomically.
+    `source_pickle` is the pickle_link of the model.p it was exported from.
+    """
+    metadata = metadata or {}
+    arrays = {name: np.ascontiguousarray(getattr(forest, name)) for name in FOREST_ARRAYS}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _align(offset + array.nbytes)
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'classes': [_to_json(c) for c in forest.classes_.tolist()],
+        'max_depth': forest.max_depth,
+        'n_features': forest.n_features_in_,
+        'arrays': layout
+    }
+    for key in METADATA_KEYS:
+        if key in metadata:
+            header[key] = _to_json(metadata[key])
+    if source_pickle is not None:
+        header['source_pickle'] = source_pickle
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(ARTIFACT_MAGIC) + 4 + len(header_bytes))
+
+    # Per-process temp name: server and worker processes may re-export at once
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(ARTIFACT_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+def load_forest_artifact(path):
+    """Memory-map a forest artifact. Returns (CompiledForest, header)."""
+    with open(path, "rb") as f:
+        if f.read(len(ARTIFACT_MAGIC)) != ARTIFACT_MAGIC:
+            raise ValueError(f"{path} is not a forest artifact")
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    if header.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {header.get('format_version')}")
+
+    data_start = _align(len(ARTIFACT_MAGIC) + 4 + header_len)
+    arrays = {}
+    for name in FOREST_ARRAYS:
+        spec = header['arrays'][name]
+        # Read-only shared mapping: every worker process reuses the same page cache
+        arrays[name] = np.memmap(path, dtype=np.dtype(spec['dtype']), mode='r',
+                                 offset=data_start + spec['offset'], shape=tuple(spec['shape']))
+
+    forest = CompiledForest(
+        classes=header['classes'],
+        max_depth=header['max_depth'],
+        n_features=header['n_features'],
+        **arrays
+    )
+    return forest, header
+
+def load_model(artifact_path, pickle_path):
+    """
+    Load the classifier used by the app.
+    - Prefers the memory-mapped artifact (no pickle, near-instant startup), but only
+      when it was exported from the current pickle (see artifact_matches), or when
+      there is no pickle at all.
+    - Otherwise loads the pickle and re-exports the artifact from it, so a model.p
+      copied in, restored from a backup or written by an older script is never
+      shadowed by a stale model.forest.
+    Returns (model, info) where info holds version/trained_at/accuracy/classes/source.
+    """
+    has_pickle = os.path.exists(pickle_path)
+    if os.path.exists(artifact_path):
+        model, header = load_forest_artifact(artifact_path)
+        if not has_pickle or artifact_matches(header, pickle_path):
+            info = {key: header.get(key) for key in METADATA_KEYS}
+            info['classes'] = header['classes']
+            info['source'] = artifact_path
+            return model, info
+        print(f"⚠️ {artifact_path} was not exported from the current {pickle_path}; loading the pickle")
+
+    with open(pickle_path, "rb") as f:
+        model_dict = pickle.load(f)
+    # Forests are flattened into NumPy arrays for fast per-frame predicts
+    model = compile_model(model_dict['model'])
+    info = {key: _to_json(model_dict.get(key)) for key in METADATA_KEYS}
+    info['classes'] = model_dict.get('classes')
+    info['source'] = pickle_path
+    try:
+        export_artifact(model_dict['model'], model_dict, artifact_path, pickle_path)
+    except OSError as e:
+        print(f"⚠️ Could not re-export {artifact_path}: {e}")
+    return model, info
+
+def export_artifact(model, metadata, artifact_path, pickle_path=None):
+    """
+    Export a trained model next to its pickle.
+    - Random forests and extra trees are written as a forest artifact, linked to
+      `pickle_path` (already written) so load_model can tell when it goes stale.
+    - Other model types remove any stale artifact so the pickle is used instead.
+    Returns True when an artifact was written.
+    """
+    compiled = compile_model(model)
+    if isinstance(compiled, CompiledForest):
+        source = pickle_link(pickle_path) if pickle_path and os.path.exists(pickle_path) else None
+        save_forest_artifact(artifact_path, compiled, metadata, source)
+        return True
+    if os.path.exists(artifact_path):
+        os.remove(artifact_path)
+    return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a pickled model.p into a memory-mappable artifact")
+    parser.add_argument('--model', default='model.p')
+    parser.add_argument('--out', default='model.forest')
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f:
+        model_dict = pickle.load(f)
+    if export_artifact(model_dict['model'], model_dict, args.out, args.model):
+        print(f"Artifact saved to {args.out}")
+    else:
+        print(f"{type(model_dict['model']).__name__} is not a tree ensemble; keep using {args.model}")
@@ -0,0 +1,198 @@
+"""
+Sweep model families and sizes for accuracy vs. per-frame inference latency.
+
+Usage: python model_sweep.py [--candidates rf_50 logreg ...] [--jobs N] [--budget-us 500] [--save best|NAME]
+
+Candidates are trained in parallel processes on the same split and augmentation as
+train_model.py. Latency is then measured one model at a time in this process,
+so the numbers are not skewed by other fits running on the same cores.
+Forests are timed in their compiled form (fast_forest), as the app runs them.
+"""
+import argparse
+import datetime
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+SEED = 0
+LATENCY_REPEATS = 300  # Single-row predicts timed per model
+LATENCY_BATCH = 8      # Batched predict size, matching BATCH_MAX_SIZE
+
+def _forest(cls, **params):
+    def build():
+        from sklearn import ensemble
+        return getattr(ensemble, cls)(n_jobs=1, random_state=SEED, **params)
+    return build
+
+def _scaled(cls, **params):
+    def build():
+        from sklearn import linear_model, neural_network
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        module = linear_model if hasattr(linear_model, cls) else neural_network
+        return make_pipeline(StandardScaler(), getattr(module, cls)(random_state=SEED, **params))
+    return build
+
+# name -> zero-argument estimator factory
+CANDIDATES = {
+    'rf_25_d12': _forest('RandomForestClassifier', n_estimators=25, max_depth=12),
+    'rf_50_d16': _forest('RandomForestClassifier', n_estimators=50, max_depth=16),
+    'rf_50': _forest('RandomForestClassifier', n_estimators=50),
+    'rf_100': _forest('RandomForestClassifier', n_estimators=100),
+    'rf_200': _forest('RandomForestClassifier', n_estimators=200),
+    'et_100': _forest('ExtraTreesClassifier', n_estimators=100),
+    'et_100_d16': _forest('ExtraTreesClassifier', n_estimators=100, max_depth=16),
+    'logreg': _scaled('LogisticRegression', max_iter=2000),
+    'mlp_64': _scaled('MLPClassifier', hidden_layer_sizes=(64,), max_iter=300),
+    'mlp_128_64': _scaled('MLPClassifier', hidden_layer_sizes=(128, 64), max_iter=300)
+}
+
+# --- TRAINING (worker processes) ---
+def fit_candidate(name, out_dir):
+    """Train one candidate, evaluate it on the held-out split and pickle it to out_dir."""
+    from sklearn.metrics import accuracy_score
+    from train_model import load_split, augmented_training_set
+
+    X_train, y_train, X_test, y_test, _ = load_split(SEED)
+    X_aug, y_aug = augmented_training_set(X_train, y_train, np.random.default_rng(SEED))
+    model = CANDIDATES[name]()
+    start = time.perf_counter()
+    model.fit(X_aug, y_aug)
+    fit_seconds = time.perf_counter() - start
+    accuracy = accuracy_score(y_test, model.predict(X_test))
+
+    path = os.path.join(out_dir, f"{name}.p")
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+    return {'name': name, 'accuracy': accuracy, 'fit_seconds': round(fit_seconds, 2), 'path': path}
+
+# --- LATENCY (this process) ---
+def latency_profile(model, rows, repeats=LATENCY_REPEATS, batch=LATENCY_BATCH):
+    """Single-row and batched predict_proba timings of the model the app would serve."""
+    from fast_forest import CompiledForest, compile_model
+
+    served = compile_model(model)
+    predict = served.predict_proba if hasattr(served, 'predict_proba') else served.predict
+    rows = np.asarray(rows, dtype=np.float64)
+    predict(rows[:batch])  # Warm-up
+
+    single = []
+    for i in range(repeats):
+        row = rows[i % len(rows)][np.newaxis, :]
+        start = time.perf_counter()
+        predict(row)
+        single.append(time.perf_counter() - start)
+    batched = []
+    for i in range(max(1, repeats // batch)):
+        start_row = (i * batch) % max(1, len(rows) - batch)
+        chunk = rows[start_row:start_row + batch]
+        start = time.perf_counter()
+        predict(chunk)
+        batched.append((time.perf_counter() - start) / len(chunk))
+
+    single = np.array(single) * 1e6
+    return {
+        'single_p50_us': round(float(np.percentile(single, 50)), 1),
+        'single_p95_us': round(float(np.percentile(single, 95)), 1),
+        'batch_size': batch,
+        'batch_per_row_us': round(float(np.median(batched) * 1e6), 1),
+        'compiled': isinstance(served, CompiledForest)
+    }
+
+def pareto_front(results):
+    """Names of candidates no other candidate beats on both accuracy and single-row p50."""
+    front = set()
+    for r in results:
+        dominated = any(
+            o['accuracy'] >= r['accuracy'] and o['single_p50_us'] <= r['single_p50_us'] and
+            (o['accuracy'] > r['accuracy'] or o['single_p50_us'] < r['single_p50_us'])
+            for o in results
+        )
+        if not dominated:
+            front.add(r['name'])
+    return front
+
+def choose(results, front, budget_us=None):
+    """Most accurate Pareto candidate within the single-row latency budget (fastest on ties)."""
+    eligible = [r for r in results if r['name'] in front]
+    if budget_us is not None:
+        eligible = [r for r in eligible if r['single_p50_us'] <= budget_us]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda r: (r['accuracy'], -r['single_p50_us']))
+
+def print_table(results, front, chosen):
+    print(f"\n{'':2}{'model':<12}{'accuracy':>9}{'fit s':>8}{'1-row p50':>11}{'1-row p95':>11}{'per row @batch':>16}")
+    for r in sorted(results, key=lambda r: r['single_p50_us']):
+        mark = '>' if chosen is not None and r['name'] == chosen['name'] else ('*' if r['name'] in front else ' ')
+        print(f"{mark:2}{r['name']:<12}{r['accuracy'] * 100:8.2f}%{r['fit_seconds']:8.1f}"
+              f"{r['single_p50_us']:9.1f}us{r['single_p95_us']:9.1f}us{r['batch_per_row_us']:14.1f}us")
+    print("* Pareto front (accuracy vs. single-row latency)   > chosen")
+
+def main(args):
+    from train_model import load_split, save_model
+
+    names = args.candidates or list(CANDIDATES)
+    unknown = [n for n in names if n not in CANDIDATES]
+    if unknown:
+        raise SystemExit(f"Unknown candidates: {', '.join(unknown)} (choose from {', '.join(CANDIDATES)})")
+
+    data = load_split(SEED)
+    if data is None:
+        return
+    _, _, X_test, _, classes = data
+
+    with tempfile.TemporaryDirectory(prefix="model_sweep_") as out_dir:
+        results = []
+        with ProcessPoolExecutor(max_workers=args.jobs or os.cpu_count()) as pool:
+            futures = {pool.submit(fit_candidate, name, out_dir): name for name in names}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {futures[future]} failed: {e}")
+                    continue
+                print(f"✅ {result['name']}: {result['accuracy'] * 100:.2f}% in {result['fit_seconds']}s")
+                results.append(result)
+        if not results:
+            return
+
+        print("Measuring predict latency...")
+        for result in results:
+            with open(result['path'], "rb") as f:
+                result['latency'] = latency_profile(pickle.load(f), X_test)
+            result.update(result['latency'])
+
+        front = pareto_front(results)
+        chosen = choose(results, front, args.budget_us)
+        print_table(results, front, chosen)
+
+        if args.save:
+            pick = chosen if args.save == 'best' else next((r for r in results if r['name'] == args.save), None)
+            if pick is None:
+                print(f"⚠️ Nothing to save for '{args.save}'" +
+                      (f" within {args.budget_us}us" if args.budget_us is not None else ""))
+                return
+            with open(pick['path'], "rb") as f:
+                model = pickle.load(f)
+            save_model({
+                'model': model,
+                'accuracy': pick['accuracy'],
+                'classes': classes,
+                'version': '1.2',
+                'trained_at': datetime.datetime.now().isoformat(),
+                'candidate': pick['name'],
+                'latency_profile': pick['latency']
+            })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel accuracy/latency sweep over gesture classifiers")
+    parser.add_argument('--candidates', nargs='*', help=f"Subset of: {' '.join(CANDIDATES)}")
+    parser.add_argument('--jobs', type=int, default=None, help="Parallel fits (default: all cores)")
+    parser.add_argument('--budget-us', type=float, default=None, help="Single-row p50 budget for --save best")
+    parser.add_argument('--save', metavar='best|NAME', help="Write the chosen candidate to model.p / model.forest")
+    main(parser.parse_args())
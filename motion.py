@@ -0,0 +1,126 @@
+import numpy as np
+
+from utils import KEYPOINT_SIZE
+
+MOTION_DATASET_DIR = "dataset_motion"  # Continuous recordings of dynamic gestures
+MOTION_MODEL_FILE = "motion.p"
+MOTION_ARTIFACT = "motion.forest"
+WINDOW_FRAMES = 16       # ~1.3s at the active client frame rate
+STATIC_LABEL = "Static"  # Motion-model class for "no dynamic gesture in this window"
+REFRESH_EVERY = 1024     # Pushes between exact recomputes of the running sums
+FEATURE_BLOCKS = ('mean', 'std', 'displacement', 'velocity', 'path')
+MOTION_FEATURE_SIZE = len(FEATURE_BLOCKS) * KEYPOINT_SIZE
+
+class MotionWindow:
+    """
+    Ring buffer of the last `size` extract_keypoints vectors with window features
+    maintained incrementally, so push() costs the same for any window length.
+    - Running sum and sum of squares give the window mean and std.
+    - displacement = newest - oldest frame, velocity = newest - previous frame.
+    - path = mean absolute frame-to-frame change, from a running sum of |delta|
+      that adds the new step and drops the step leaving the window.
+    - Sums are recomputed exactly every `refresh_every` pushes (amortized O(1)) so
+      floating-point drift cannot build up over a long session.
+    Keypoints are wrist-relative, so rotation and handshape changes are visible to
+    the features but moving a fixed handshape across the frame is not.
+    """
+
+    def __init__(self, size=WINDOW_FRAMES, dim=KEYPOINT_SIZE, refresh_every=REFRESH_EVERY):
+        self.size = max(2, int(size))
+        self.dim = dim
+        self.refresh_every = refresh_every
+        self.frames = np.zeros((self.size, dim))
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.head = 0  # Slot the next frame is written to (the oldest once full)
+        self.pushes = 0
+        self.sum = np.zeros(self.dim)
+        self.sumsq = np.zeros(self.dim)
+        self.path_sum = np.zeros(self.dim)
+        self.velocity = np.zeros(self.dim)
+
+    def push(self, keypoints):
+        """Add one frame. Returns the feature vector once the window is full, else None."""
+        x = np.asarray(keypoints, dtype=np.float64)
+        newest = self.frames[self.head - 1]
+        if self.count == self.size:
+            oldest = self.frames[self.head]
+            self.sum -= oldest
+            self.sumsq -= oldest * oldest
+            self.path_sum -= np.abs(self.frames[(self.head + 1) % self.size] - oldest)
+        if self.count:
+            self.velocity = x - newest
+            self.path_sum += np.abs(self.velocity)
+
+        self.frames[self.head] = x
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self.sum += x
+        self.sumsq += x * x
+        self.pushes += 1
+        if self.pushes % self.refresh_every == 0:
+            self._recompute()
+        return self.features() if self.count == self.size else None
+
+    def _recompute(self):
+        window = self.ordered()
+        self.sum = window.sum(axis=0)
+        self.sumsq = (window * window).sum(axis=0)
+        self.path_sum = np.abs(np.diff(window, axis=0)).sum(axis=0)
+
+    def ordered(self):
+        """Frames in the window, oldest first (a copy, for checks and recomputes)."""
+        if self.count < self.size:
+            return self.frames[:self.count].copy()
+        return np.roll(self.frames, -self.head, axis=0)
+
+    def features(self):
+        n = self.count
+        mean = self.sum / n
+        std = np.sqrt(np.maximum(self.sumsq / n - mean * mean, 0.0))
+        oldest = self.frames[self.head if n == self.size else 0]
+        displacement = self.frames[self.head - 1] - oldest
+        path = self.path_sum / max(1, n - 1)
+        return np.concatenate([mean, std, displacement, self.velocity, path])
+
+def window_features(rows, size=WINDOW_FRAMES, stride=1):
+    """
+    Feature rows for one continuous recording, exactly as a live session computes them:
+    no-hand (all-zero) frames restart the window. Returns (n, MOTION_FEATURE_SIZE).
+    """
+    window = MotionWindow(size)
+    features = []
+    since_full = 0
+    for row in rows:
+        if not np.any(row):
+            window.reset()
+            since_full = 0
+            continue
+        vector = window.push(row)
+        if vector is not None:
+            if since_full % stride == 0:
+                features.append(vector)
+            since_full += 1
+    if not features:
+        return np.empty((0, MOTION_FEATURE_SIZE))
+    return np.vstack(features)
+
+def mix_scores(scores, labels, proba, static_label=STATIC_LABEL):
+    """
+    Merge motion-model probabilities into one frame's {gesture: probability} scores.
+    - The static per-frame scores are scaled by P(static_label).
+    - Every dynamic class adds its own probability, so the smoother sees a single
+      distribution over static and dynamic gestures.
+    """
+    p_static = 1.0
+    merged = {}
+    for label, p in zip(labels, proba):
+        if label == static_label:
+            p_static = float(p)
+        else:
+            merged[label] = merged.get(label, 0.0) + float(p)
+    for label, p in scores.items():
+        merged[label] = merged.get(label, 0.0) + p * p_static
+    return merged
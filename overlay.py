@@ -0,0 +1,147 @@
+import functools
+
+import cv2
+import numpy as np
+import mediapipe as mp
+
+# Colors (BGR) for Cyberpunk Theme
+COLOR_NEON_GREEN = (57, 255, 20)
+COLOR_CYAN = (255, 255, 0)
+COLOR_ELECTRIC_BLUE = (255, 128, 0)
+COLOR_WHITE = (255, 255, 255)
+
+FINGERTIPS = (4, 8, 12, 16, 20)
+NODE_RADIUS = 5
+TIP_RADIUS = 8
+EDGES = np.array(sorted(mp.solutions.hands.HAND_CONNECTIONS), dtype=np.intp)  # (E, 2) landmark indices
+MOVE_THRESHOLD = 1  # Pixels a landmark may move before a cached hand is redrawn
+_PAD = TIP_RADIUS + 4  # Stamp margin around the landmarks: node ring plus beam width
+_PIXEL = np.dtype((np.void, 3))  # One BGR pixel, so a blit is a single indexed copy
+
+# --- NODE SPRITES ---
+def _node_sprite(radius):
+    """Offsets (dy, dx) and BGR colors of every pixel one node draws, rendered once with cv2."""
+    c = radius + 3
+    colors = np.zeros((2 * c + 1, 2 * c + 1, 3), np.uint8)
+    mask = np.zeros(colors.shape[:2], np.uint8)
+    for image, ring, fill, dot in ((colors, COLOR_ELECTRIC_BLUE, COLOR_NEON_GREEN, COLOR_WHITE), (mask, 255, 255, 255)):
+        cv2.circle(image, (c, c), radius + 2, ring, 1)
+        cv2.circle(image, (c, c), radius, fill, -1)
+        cv2.circle(image, (c, c), 2, dot, -1)
+    dy, dx = np.nonzero(mask)
+    return dy - c, dx - c, colors[dy, dx]
+
+def _hand_sprites():
+    """All 21 node sprites of a hand concatenated in landmark order (later nodes overwrite earlier ones)."""
+    sprites = {r: _node_sprite(r) for r in (NODE_RADIUS, TIP_RADIUS)}
+    owner, dy, dx, colors = [], [], [], []
+    for idx in range(21):
+        s_dy, s_dx, s_colors = sprites[TIP_RADIUS if idx in FINGERTIPS else NODE_RADIUS]
+        owner.append(np.full(len(s_dy), idx, dtype=np.intp))
+        dy.append(s_dy)
+        dx.append(s_dx)
+        colors.append(s_colors)
+    colors = np.ascontiguousarray(np.concatenate(colors))
+    return np.concatenate(owner), np.concatenate(dy), np.concatenate(dx), colors, colors.view(_PIXEL).ravel()
+
+_OWNER, _DY, _DX, _COLORS, _COLOR_PIXELS = _hand_sprites()
+
+# --- RENDER ---
+def landmark_pixels(hand_landmarks, w, h):
+    """(21, 2) int32 pixel coordinates, reading each protobuf landmark once."""
+    points = np.array([(lm.x, lm.y) for lm in hand_landmarks.landmark])
+    return (points * (w, h)).astype(np.int32)
+
+def _pixels(image):
+    """Flat one-element-per-pixel view of a contiguous BGR image, or None."""
+    if not image.flags.c_contiguous:
+        return None
+    return image.view(_PIXEL).reshape(-1)
+
+@functools.lru_cache(maxsize=8)
+def _sprite_offsets(w):
+    """Flat pixel offsets of every sprite pixel from its node, for frames `w` pixels wide."""
+    return _DY * w + _DX
+
+def blit_nodes(image, pts):
+    """Composite every node sprite with one indexed copy."""
+    h, w = image.shape[:2]
+    pixels = _pixels(image)
+    margin = TIP_RADIUS + 3
+    if (pixels is not None and pts.min() >= margin
+            and pts[:, 0].max() < w - margin and pts[:, 1].max() < h - margin):
+        pixels[(pts[:, 1] * w + pts[:, 0])[_OWNER] + _sprite_offsets(w)] = _COLOR_PIXELS
+        return
+    # Near the border: clip sprite pixels to the frame
+    xs = pts[_OWNER, 0] + _DX
+    ys = pts[_OWNER, 1] + _DY
+    keep = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    image[ys[keep], xs[keep]] = _COLORS[keep]
+
+def render_hand(image, pts):
+    """
+    One hand: energy beams as two batched cv2.polylines calls (outer, inner), then
+    the node sprites. Beams are drawn outer-then-inner for all edges at once rather
+    than per edge, which only differs where two beams cross outside a node.
+    """
+    segments = pts[EDGES]
+    cv2.polylines(image, segments, False, COLOR_ELECTRIC_BLUE, 4)
+    cv2.polylines(image, segments, False, COLOR_CYAN, 2)
+    blit_nodes(image, pts)
+
+def hand_stamp(pts, w, h):
+    """Render one hand into a small layer. Returns (flat frame pixel indices, pixel colors) it drew."""
+    x0, y0 = np.maximum(pts.min(axis=0) - _PAD, 0)
+    x1, y1 = np.minimum(pts.max(axis=0) + _PAD + 1, (w, h))
+    if x1 <= x0 or y1 <= y0:
+        return np.empty(0, np.intp), np.empty(0, _PIXEL)
+    layer = np.zeros((y1 - y0, x1 - x0, 3), np.uint8)
+    render_hand(layer, (pts - (x0, y0)).astype(np.int32))
+    # Every overlay color has a bright channel, so drawn pixels are exactly the non-zero gray ones
+    drawn = np.flatnonzero(cv2.cvtColor(layer, cv2.COLOR_BGR2GRAY) > 0)
+    ys, xs = np.divmod(drawn, layer.shape[1])
+    return (ys + y0) * w + (xs + x0), _pixels(layer)[drawn]
+
+class HandOverlay:
+    """
+    Per-stream overlay renderer that reuses a hand's pixels while it holds still.
+    - A moving hand is drawn directly with render_hand.
+    - Once a hand's landmarks all stay within `move_threshold` pixels of where it was
+      drawn, it is rendered once more into a stamp (the flat indices and colors of
+      its pixels, see hand_stamp); every later frame within the threshold just
+      composites the stamp with one indexed copy.
+    - Positions are compared with the drawn or stamped pose, not the previous frame,
+      so slow drift cannot accumulate past the threshold.
+    - One instance per video stream (one frame at a time); not thread-safe.
+    """
+
+    def __init__(self, move_threshold=MOVE_THRESHOLD):
+        self.move_threshold = move_threshold
+        self._slots = []  # Per hand slot: [pts, frame shape, stamp or None]
+        self.hits = 0
+        self.misses = 0
+
+    def draw(self, image, results):
+        slots = []
+        pixels = _pixels(image)
+        if results.multi_hand_landmarks:
+            h, w = image.shape[:2]
+            for slot, hand_landmarks in enumerate(results.multi_hand_landmarks):
+                pts = landmark_pixels(hand_landmarks, w, h)
+                cached = self._slots[slot] if slot < len(self._slots) else None
+                if (pixels is not None and cached is not None and cached[1] == image.shape
+                        and np.abs(pts - cached[0]).max() <= self.move_threshold):
+                    if cached[2] is None:
+                        cached[2] = hand_stamp(cached[0], w, h)
+                    indices, colors = cached[2]
+                    pixels[indices] = colors
+                    self.hits += 1
+                    slots.append(cached)
+                else:
+                    render_hand(image, pts)
+                    self.misses += 1
+                    slots.append([pts, image.shape, None])
+        self._slots = slots
+
+    def reset(self):
+        self._slots = []
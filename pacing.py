@@ -0,0 +1,68 @@
+import time
+
+class FramePacer:
+    """
+    Per-session capture pacing, sent to the browser as pacing_update.
+    - No hand seen for `idle_after` seconds: drop to `idle_interval_ms` and `idle_width`
+      pixels wide, so an unattended kiosk costs a few small frames per second.
+    - A hand in any frame: back to the active rate at full resolution immediately.
+    - While active, the interval follows the server: the smoothed processing time of
+      a frame, scaled by how many frames are queued ahead of it, with `headroom`.
+    - The average starts at `active_interval_ms`; the first `warmup_frames` samples
+      (cold MediaPipe graphs, first model load) are ignored and every sample is capped
+      at `max_interval_ms`, so one slow frame cannot hold a client back for seconds.
+    - observe() returns a new target only when it changed meaningfully, to avoid chatter,
+      except that reaching the mode's floor interval is always sent.
+    """
+
+    def __init__(self, active_interval_ms=80, idle_interval_ms=500, idle_after=3.0,
+                 idle_width=320, max_interval_ms=1000, headroom=1.2, smoothing=0.2,
+                 warmup_frames=2, now=None):
+        self.active_interval_ms = active_interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.idle_after = idle_after
+        self.idle_width = idle_width
+        self.max_interval_ms = max_interval_ms
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.warmup_frames = warmup_frames
+        self.last_hand_time = time.monotonic() if now is None else now
+        self.samples = 0
+        self.processing_ms = float(active_interval_ms)
+        self.mode = 'active'
+        self.interval_ms = active_interval_ms
+        self.max_width = None  # None = the camera's native width
+
+    def _load_interval(self, queue_depth):
+        interval = self.processing_ms * (1 + queue_depth) * self.headroom
+        return min(self.max_interval_ms, max(self.active_interval_ms, interval))
+
+    def observe(self, hand_present, processing_seconds, queue_depth=0, now=None):
+        """Record one processed frame. Returns the new {'mode', 'interval_ms', 'max_width'} or None."""
+        now = time.monotonic() if now is None else now
+        self.samples += 1
+        if self.samples > self.warmup_frames:
+            sample = min(processing_seconds * 1000.0, self.max_interval_ms)
+            self.processing_ms += self.smoothing * (sample - self.processing_ms)
+        if hand_present:
+            self.last_hand_time = now
+
+        if now - self.last_hand_time > self.idle_after:
+            mode, floor, width = 'idle', self.idle_interval_ms, self.idle_width
+        else:
+            mode, floor, width = 'active', self.active_interval_ms, None
+        interval = max(floor, self._load_interval(queue_depth))
+        if interval > floor:
+            interval = max(floor, int(round(interval / 10.0)) * 10)
+
+        # Mode switches and returns to the floor go out at once; other rate changes
+        # only when they move by more than 20%
+        if mode == self.mode and interval == self.interval_ms:
+            return None
+        if mode == self.mode and interval != floor and abs(interval - self.interval_ms) <= 0.2 * self.interval_ms:
+            return None
+        self.mode, self.interval_ms, self.max_width = mode, interval, width
+        return self.target()
+
+    def target(self):
+        return {'mode': self.mode, 'interval_ms': self.interval_ms, 'max_width': self.max_width}
@@ -0,0 +1,179 @@
+import base64
+import functools
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from metrics import span
+from overlay import landmark_pixels, render_hand
+
+JPEG_QUALITY = 50
+DATA_URL_PREFIX = 'data:image/jpeg;base64,'
+
+mp_hands = mp.solutions.hands
+mp_drawing = mp.solutions.drawing_utils
+
+# Gesture names for models that predict class indices
+CLASSES = [
+    "Nothing", "Hello", "Thank You", "Good", "Bad", "Yes", 
+    "Water", "Food", "Toilet", "Medicine", "Money", 
+    "Help", "Pain", "Call Doctor", "Police", "Home", 
+    "What", "Where", "Time", "I Love You", "Stop",
+    "No", "Please", "Sorry", "Friend", "Mother", 
+    "Book", "Tea", "Name", "Happy" 
+]
+
+# --- DECODE ---
+def is_binary_payload(data):
+    return isinstance(data, (bytes, bytearray, memoryview))
+
+def payload_bytes(data):
+    """Raw image bytes of a video_frame payload (binary as-is, data URLs base64-decoded)."""
+    if is_binary_payload(data):
+        return data
+    _, _, data = data.rpartition(',')
+    return base64.b64decode(data)
+
+def decode_frame(data):
+    """
+    Decodes a video_frame payload into a BGR image.
+    - Binary payloads (raw JPEG/WebP bytes) are wrapped with np.frombuffer, no copy.
+    - String payloads are the legacy base64 data URLs from canvas.toDataURL.
+    """
+    with span('decode'):
+        return cv2.imdecode(np.frombuffer(payload_bytes(data), np.uint8), cv2.IMREAD_COLOR)
+
+def prepare_frame(data):
+    """Decode and mirror a payload. Returns (BGR frame for drawing, RGB frame for MediaPipe)."""
+    frame = decode_frame(data)
+    with span('flip_convert'):
+        frame = cv2.flip(frame, 1)
+        return frame, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+# --- CLASSIFY ---
+def classify_rows(model, rows):
+    """
+    Classify stacked extract_keypoints rows in one call.
+    Returns (predictions, confidences, proba); confidences and proba rows are None
+    without predict_proba. proba columns follow model.classes_.
+    """
+    if hasattr(model, 'predict_proba'):
+        # Same argmax model.predict uses, plus the winning class probability
+        proba = model.predict_proba(rows)
+        best = np.argmax(proba, axis=1)
+        return model.classes_.take(best), proba[np.arange(len(best)), best], proba
+    return model.predict(rows), [None] * len(rows), [None] * len(rows)
+
+def decode_prediction(prediction_result):
+    """Map a raw model output (label or class index) to a gesture name."""
+    if isinstance(prediction_result, str):
+        return "Nothing" if prediction_result.lower() == "bus" else prediction_result
+    prediction_index = int(prediction_result)
+    if 0 <= prediction_index < len(CLASSES):
+        return CLASSES[prediction_index]
+    return "Nothing"
+
+@functools.lru_cache(maxsize=8)
+def decoded_labels(classes):
+    return tuple(decode_prediction(c) for c in classes)
+
+def frame_scores(prediction, proba=None, classes=None):
+    """{gesture: probability} for one frame, the smoother's input ({} when no hand was seen)."""
+    if proba is not None and classes is not None:
+        scores = {}
+        for label, p in zip(decoded_labels(tuple(classes)), proba):
+            scores[label] = scores.get(label, 0.0) + float(p)
+        return scores
+    if prediction is not None:
+        return {decode_prediction(prediction): 1.0}
+    return {}
+
+# --- DRAW ---
+def draw_robotic_hands(image, hand_landmarks):
+    h, w = image.shape[:2]
+    render_hand(image, landmark_pixels(hand_landmarks, w, h))
+
+def draw_hands(image, results, overlay=None):
+    """
+    Draw every detected hand, falling back to MediaPipe's default style.
+    - `overlay` (the stream's HandOverlay) reuses hands that have not moved since the last frame.
+    """
+    if not results.multi_hand_landmarks:
+        if overlay is not None:
+            overlay.reset()
+        return
+    try:
+        if overlay is not None:
+            overlay.draw(image, results)
+            return
+        for hand_landmarks in results.multi_hand_landmarks:
+            draw_robotic_hands(image, hand_landmarks)
+    except Exception:
+        for hand_landmarks in results.multi_hand_landmarks:
+            mp_drawing.draw_landmarks(image, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+
+def pack_hands(results):
+    """
+    Compact overlay data for client-side rendering.
+    - One entry per detected hand: MediaPipe handedness label plus 21 (x, y)
+      normalized coordinates as little-endian float32 bytes (168 bytes per hand).
+    """
+    hands = []
+    if results.multi_hand_landmarks:
+        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+            points = np.array([(lm.x, lm.y) for lm in hand_landmarks.landmark], dtype='<f4')
+            hands.append({
+                'label': handedness.classification[0].label,
+                'points': points.tobytes()
+            })
+    return hands
+
+# --- ENCODE ---
+def encode_jpeg(frame, quality=JPEG_QUALITY):
+    _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buffer
+
+def frame_payload(jpeg, binary=False):
+    """
+    Wraps encoded JPEG bytes for the processed_frame event.
+    - binary=True returns raw bytes (sent as a socket.io binary attachment).
+    - binary=False returns the legacy base64 data URL string.
+    """
+    if binary:
+        return bytes(jpeg)
+    return DATA_URL_PREFIX + base64.b64encode(jpeg).decode('ascii')
+
+def encode_frame(frame, binary=False, quality=JPEG_QUALITY):
+    """JPEG-encodes an annotated frame into a processed_frame payload."""
+    return frame_payload(encode_jpeg(frame, quality), binary)
+
+# --- RESULT ---
+class FrameOutcome:
+    """What one processed video frame produced, wherever it was processed."""
+
+    def __init__(self, prediction=None, confidence=None, keypoints=None, hands=None, jpeg=None,
+                 proba=None, classes=None):
+        self.prediction = prediction
+        self.confidence = confidence
+        self.proba = proba      # Full class probabilities, in `classes` order
+        self.classes = classes
+        self.keypoints = keypoints
+        self.hands = hands
+        self.jpeg = jpeg
+
+def finish_frame(frame, results, prediction, confidence, keypoints, render, proba=None, classes=None, overlay=None):
+    """
+    Final stage of a video frame.
+    - render=True draws the overlay (through the stream's HandOverlay, if given)
+      and JPEG-encodes the annotated frame.
+    - render=False packs the landmarks for client-side drawing instead.
+    """
+    if render:
+        with span('draw'):
+            draw_hands(frame, results, overlay)
+        with span('encode'):
+            jpeg = encode_jpeg(frame)
+        return FrameOutcome(prediction, confidence, keypoints, jpeg=jpeg, proba=proba, classes=classes)
+    with span('pack_hands'):
+        hands = pack_hands(results)
+    return FrameOutcome(prediction, confidence, keypoints, hands=hands, proba=proba, classes=classes)
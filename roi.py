@@ -0,0 +1,128 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+class RoiStats:
+    """Hit/miss counters shared by every RoiHands instance in a process."""
+
+    FIELDS = ('hits', 'misses', 'full', 'expired')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def count(self, field):
+        with self._lock:
+            self._counts[field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+def landmarks_bbox(results):
+    """Normalized (x0, y0, x1, y1) around every detected landmark."""
+    xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+    ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+    return min(xs), min(ys), max(xs), max(ys)
+
+class RoiHands:
+    """
+    Wraps a Hands instance so it only looks at the region the hands were last seen in.
+    - After a full-frame detection, the next frames are cropped to the landmarks'
+      bounding box (grown by `margin` of its size, squared), downscaled to at most
+      `max_side` pixels, and only that crop goes through MediaPipe.
+    - Landmarks found in the crop are mapped back in place to full-frame normalized
+      coordinates (z scales with the crop width like x), so extract_keypoints,
+      drawing and pack_hands see exactly what a full-frame pass would produce.
+    - No hand in the crop (miss), or the ROI is older than `ttl` seconds (so new hands
+      entering elsewhere are picked up): the full frame is processed instead.
+    - The tracking-mode graph is reset whenever input switches between crops and
+      full frames, so it never tracks from landmarks in the other coordinate frame.
+      Consecutive crops follow the hand and stay roughly centered on it.
+    - Same process()/reset() interface as Hands, so the pool can hand it out directly.
+    """
+
+    def __init__(self, hands, stats, margin=0.25, ttl=1.0, max_side=256, max_area=0.6):
+        self.hands = hands
+        self.stats = stats
+        self.margin = margin
+        self.ttl = ttl
+        self.max_side = max_side
+        self.max_area = max_area
+        self.box = None
+        self.box_expires = 0.0
+        self.mode = None  # 'crop' or 'full': what the tracker last saw
+
+    def reset(self):
+        self.box = None
+        self.mode = None
+        self.hands.reset()
+
+    def _track(self, mode, image):
+        if self.mode != mode:
+            if self.mode is not None:
+                self.hands.reset()
+            self.mode = mode
+        return self.hands.process(image)
+
+    def _crop_region(self, w, h):
+        x0, y0, x1, y1 = self.box
+        side = max((x1 - x0) * w, (y1 - y0) * h) * (1 + 2 * self.margin)
+        cx, cy = (x0 + x1) / 2 * w, (y0 + y1) / 2 * h
+        left, top = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+        right, bottom = int(min(w, cx + side / 2)), int(min(h, cy + side / 2))
+        if right - left < 16 or bottom - top < 16:
+            return None
+        # A crop this large saves nothing over the full frame
+        if (right - left) * (bottom - top) > self.max_area * w * h:
+            return None
+        return left, top, right, bottom
+
+    def process(self, frame_rgb):
+        h, w = frame_rgb.shape[:2]
+        now = time.monotonic()
+        if self.box is not None and now >= self.box_expires:
+            self.stats.count('expired')
+            self.box = None
+
+        region = self._crop_region(w, h) if self.box is not None else None
+        if region is not None:
+            left, top, right, bottom = region
+            crop = frame_rgb[top:bottom, left:right]
+            longest = max(crop.shape[:2])
+            if longest > self.max_side:
+                scale = self.max_side / longest
+                crop = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))),
+                                  interpolation=cv2.INTER_AREA)
+            results = self._track('crop', np.ascontiguousarray(crop))
+            if results.multi_hand_landmarks:
+                self._to_frame(results, left / w, top / h, (right - left) / w, (bottom - top) / h)
+                # Follow the hand, but keep the expiry of the last full-frame detection
+                self.box = landmarks_bbox(results)
+                self.stats.count('hits')
+                return results
+            self.stats.count('misses')
+
+        results = self._track('full', frame_rgb)
+        self.stats.count('full')
+        if results.multi_hand_landmarks:
+            self.box = landmarks_bbox(results)
+            self.box_expires = now + self.ttl
+        else:
+            self.box = None
+        return results
+
+    @staticmethod
+    def _to_frame(results, x0, y0, sx, sy):
+        for hand in results.multi_hand_landmarks:
+            for lm in hand.landmark:
+                lm.x = x0 + lm.x * sx
+                lm.y = y0 + lm.y * sy
+                lm.z = lm.z * sx
+
+def roi_factory(stats, **options):
+    """SessionHandsPool factory that wraps each tracking-mode Hands instance in RoiHands."""
+    from hands_pool import create_hands
+    return lambda: RoiHands(create_hands(static_image_mode=False), stats, **options)
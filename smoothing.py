@@ -0,0 +1,205 @@
+"""
+Temporal smoothing of per-frame gesture predictions, plus an offline evaluator.
+
+Evaluator usage:
+    python smoothing.py [--streams streams.npz] [--alpha 0.4 0.5 0.6] [--fps 10]
+
+Without --streams, probability streams are built from the dataset store: consecutive
+frames of each class recording, in random order with no-hand gaps, are classified
+with the current model. Recordings are replayed through the legacy N-identical
+buffer and the EMA smoother to compare time-to-recognition and flicker.
+"""
+import argparse
+import collections
+
+import numpy as np
+
+IDLE_LABEL = "Nothing"
+
+class ProbabilitySmoother:
+    """
+    Exponential moving average over per-frame class probabilities, with hysteresis.
+    - update(scores) takes {label: probability} for one frame ({} when no hand is seen)
+      and returns the stable label.
+    - A label becomes stable as soon as its averaged probability reaches `enter`;
+      a confident frame is enough, several agreeing frames are not required.
+    - Switching away needs the challenger to lead the current label by `margin`,
+      or the current label to decay below `exit`, so one noisy frame does not flip it.
+    - Averages are kept per label, so a hot-reloaded model with other classes just works.
+    """
+
+    def __init__(self, alpha=0.5, enter=0.5, exit=0.3, margin=0.1, idle=IDLE_LABEL):
+        self.alpha = alpha
+        self.enter = enter
+        self.exit = exit
+        self.margin = margin
+        self.idle = idle
+        self.scores = {}
+        self.current = idle
+
+    def update(self, scores):
+        keep = 1.0 - self.alpha
+        smoothed = {label: p * keep for label, p in self.scores.items() if p * keep >= 1e-3}
+        for label, p in scores.items():
+            smoothed[label] = smoothed.get(label, 0.0) + self.alpha * float(p)
+        self.scores = smoothed
+
+        current_score = smoothed.get(self.current, 0.0)
+        if self.current != self.idle and current_score < self.exit:
+            self.current = self.idle
+            current_score = smoothed.get(self.idle, 0.0)
+        if smoothed:
+            best = max(smoothed, key=smoothed.get)
+            best_score = smoothed[best]
+            if best != self.current and best_score >= self.enter and (
+                    self.current == self.idle or best_score >= current_score + self.margin):
+                self.current = best
+        return self.current
+
+    def reset(self):
+        self.scores = {}
+        self.current = self.idle
+
+class LegacyBuffer:
+    """The original rule: a label is stable once the last `size` frame labels are identical."""
+
+    def __init__(self, size=3, idle=IDLE_LABEL):
+        self.buffer = collections.deque(maxlen=size)
+        self.idle = idle
+        self.current = idle
+
+    def update(self, scores):
+        self.buffer.append(max(scores, key=scores.get) if scores else self.idle)
+        if len(self.buffer) == self.buffer.maxlen and len(set(self.buffer)) == 1:
+            self.current = self.buffer[0]
+        return self.current
+
+    def reset(self):
+        self.buffer.clear()
+        self.current = self.idle
+
+def make_smoother(mode, buffer_size=3, **params):
+    """'ema' (ProbabilitySmoother) or 'buffer' (the legacy N-identical rule)."""
+    if mode == 'buffer':
+        return LegacyBuffer(buffer_size)
+    return ProbabilitySmoother(**params)
+
+# --- OFFLINE EVALUATION ---
+def stream_scores(labels, proba):
+    """Per-frame score dicts from a (T, C) probability matrix; NaN rows are no-hand frames."""
+    frames = []
+    for row in proba:
+        if np.isnan(row).any():
+            frames.append({})
+        else:
+            frames.append(dict(zip(labels, row.tolist())))
+    return frames
+
+def evaluate(smoother, frames, truth, idle=IDLE_LABEL):
+    """
+    Replay one stream. Returns:
+    - latencies: frames from each gesture segment's start to its first correct stable label
+    - missed: gesture segments never recognized
+    - false_switches: stable-label changes to a label other than the ground truth
+    - accuracy: fraction of frames whose stable label equals the ground truth
+    """
+    smoother.reset()
+    latencies, missed, false_switches, correct = [], 0, 0, 0
+    previous = smoother.current
+    segment_start, recognized = 0, True
+    for t, (scores, expected) in enumerate(zip(frames, truth)):
+        if t == 0 or expected != truth[t - 1]:
+            if not recognized:
+                missed += 1
+            segment_start, recognized = t, expected == idle
+        stable = smoother.update(scores)
+        if stable != previous and stable != expected:
+            false_switches += 1
+        if stable == expected:
+            correct += 1
+            if not recognized:
+                latencies.append(t - segment_start + 1)
+                recognized = True
+        previous = stable
+    if not recognized:
+        missed += 1
+    return {
+        'latencies': latencies,
+        'missed': missed,
+        'false_switches': false_switches,
+        'accuracy': correct / max(1, len(truth))
+    }
+
+def build_keypoint_stream(n_segments, segment_frames, gap_frames, seed=0, root=None):
+    """
+    Consecutive recorded frames of random gestures from the dataset store, each
+    segment preceded by `gap_frames` no-hand (all-zero) rows.
+    Returns (keypoints (T, KEYPOINT_SIZE), truth).
+    """
+    from dataset_store import DatasetStore
+    from utils import KEYPOINT_SIZE
+
+    store = DatasetStore(root) if root else DatasetStore()
+    names = [label for label in store.labels() if label != IDLE_LABEL]
+    if not names:
+        raise ValueError("the dataset store has no gesture recordings")
+    rng = np.random.default_rng(seed)
+    rows, truth = [], []
+    for _ in range(n_segments):
+        label = names[rng.integers(len(names))]
+        shard = store.shard(label)
+        start = rng.integers(0, max(1, len(shard) - segment_frames))
+        segment = np.asarray(shard[start:start + segment_frames], dtype=np.float64)
+        rows.append(np.zeros((gap_frames, KEYPOINT_SIZE)))
+        rows.append(segment)
+        truth.extend([IDLE_LABEL] * gap_frames + [label] * len(segment))
+    return np.vstack(rows), truth
+
+def build_streams(n_segments, segment_frames, gap_frames, seed=0, root=None):
+    """Classify a build_keypoint_stream with the current model. Returns (labels, proba, truth)."""
+    from model_store import load_model
+
+    model, _ = load_model("model.forest", "model.p")
+    keypoints, truth = build_keypoint_stream(n_segments, segment_frames, gap_frames, seed, root)
+    proba = np.full((len(truth), len(model.classes_)), np.nan)
+    gesture_rows = np.any(keypoints, axis=1)
+    proba[gesture_rows] = model.predict_proba(keypoints[gesture_rows])
+    labels = [str(c) for c in model.classes_]
+    return labels, proba, truth
+
+def summarize(name, result, fps):
+    latencies = np.array(result['latencies'] or [np.nan])
+    print(f"{name:<22}{np.nanmean(latencies):7.2f}{np.nanpercentile(latencies, 95):7.1f}"
+          f"{np.nanmean(latencies) / fps * 1000:9.0f}ms{result['missed']:8d}"
+          f"{result['false_switches']:9d}{result['accuracy'] * 100:9.2f}%")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare prediction smoothers on recorded probability streams")
+    parser.add_argument('--streams', help="npz with labels, proba (T, C; NaN rows = no hand) and truth")
+    parser.add_argument('--save-streams', help="Write the generated streams to this npz")
+    parser.add_argument('--segments', type=int, default=200)
+    parser.add_argument('--segment-frames', type=int, default=30)
+    parser.add_argument('--gap-frames', type=int, default=5)
+    parser.add_argument('--alpha', type=float, nargs='*', default=[0.4, 0.5, 0.6])
+    parser.add_argument('--enter', type=float, default=0.5)
+    parser.add_argument('--exit', type=float, default=0.3)
+    parser.add_argument('--margin', type=float, default=0.1)
+    parser.add_argument('--buffer-size', type=int, default=3)
+    parser.add_argument('--fps', type=float, default=10.0, help="Frame rate used to convert latency to ms")
+    args = parser.parse_args()
+
+    if args.streams:
+        data = np.load(args.streams, allow_pickle=False)
+        labels, proba, truth = data['labels'].tolist(), data['proba'], data['truth'].tolist()
+    else:
+        labels, proba, truth = build_streams(args.segments, args.segment_frames, args.gap_frames)
+        if args.save_streams:
+            np.savez_compressed(args.save_streams, labels=np.array(labels), proba=proba, truth=np.array(truth))
+    frames = stream_scores(labels, proba)
+
+    print(f"{len(truth)} frames, {len(set(truth)) - 1} gesture classes")
+    print(f"{'smoother':<22}{'lat':>7}{'p95':>7}{'lat':>11}{'missed':>8}{'flicker':>9}{'acc':>10}")
+    summarize(f"buffer({args.buffer_size})", evaluate(LegacyBuffer(args.buffer_size), frames, truth), args.fps)
+    for alpha in args.alpha:
+        smoother = ProbabilitySmoother(alpha, args.enter, args.exit, args.margin)
+        summarize(f"ema(a={alpha})", evaluate(smoother, frames, truth), args.fps)
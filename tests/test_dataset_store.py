@@ -0,0 +1,64 @@
+"""
+A legacy data.csv is imported once, whatever the store already holds.
+
+Usage: python -m pytest tests/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import DatasetStore
+from utils import KEYPOINT_SIZE
+
+def write_csv(path, labels, rows_per_label=10):
+    frames = []
+    for i, label in enumerate(labels):
+        values = np.full((rows_per_label, KEYPOINT_SIZE), i, dtype=np.float32)
+        frame = pd.DataFrame(values)
+        frame.insert(0, 'label', label)
+        frames.append(frame)
+    pd.concat(frames).to_csv(path, index=False)
+
+def test_import_keeps_csv_classes_after_a_rerecording(tmp_path):
+    csv_path = str(tmp_path / "data.csv")
+    write_csv(csv_path, ["Hello", "Water", "Yes"])
+    store = DatasetStore(str(tmp_path / "dataset"))
+
+    # Re-record one class before anything imported data.csv
+    store.save_recording("Hello", np.full((3, KEYPOINT_SIZE), 9.0))
+    counts = store.import_legacy(csv_path)
+
+    assert counts == {"Water": 10, "Yes": 10}
+    assert sorted(store.labels()) == ["Hello", "Water", "Yes"]
+    # The newer recording wins over the CSV rows
+    assert len(store.shard("Hello")) == 3
+    assert np.all(store.shard("Hello") == 9.0)
+
+def test_import_runs_once(tmp_path):
+    csv_path = str(tmp_path / "data.csv")
+    write_csv(csv_path, ["Hello", "Water"])
+    store = DatasetStore(str(tmp_path / "dataset"))
+
+    assert store.import_legacy(csv_path) == {"Hello": 10, "Water": 10}
+    store.save_recording("Water", np.zeros((2, KEYPOINT_SIZE)))
+    assert store.import_legacy(csv_path) is None
+    assert len(store.shard("Water")) == 2
+
+def test_missing_csv_is_a_no_op(tmp_path):
+    store = DatasetStore(str(tmp_path / "dataset"))
+    assert store.import_legacy(str(tmp_path / "data.csv")) is None
+    assert store.labels() == []
+
+def test_load_split_trains_on_every_csv_class(tmp_path, monkeypatch):
+    import train_model
+
+    monkeypatch.chdir(tmp_path)
+    write_csv("data.csv", ["Hello", "Water", "Yes"])
+    DatasetStore("dataset").save_recording("Hello", np.full((10, KEYPOINT_SIZE), 9.0))
+
+    *_, classes = train_model.load_split(seed=0)
+    assert sorted(classes) == ["Hello", "Water", "Yes"]
@@ -0,0 +1,41 @@
+"""
+compile_model only compiles plain forests; other tree ensembles pass through untouched.
+
+Usage: python -m pytest tests/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pytest
+from sklearn.ensemble import (AdaBoostClassifier, BaggingClassifier, ExtraTreesClassifier,
+                              RandomForestClassifier)
+
+from fast_forest import CompiledForest, compile_model
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 12))
+    y = np.where(X[:, 0] + X[:, 3] > 0, "A", np.where(X[:, 5] > 0.5, "B", "C"))
+    return X, y
+
+@pytest.mark.parametrize("forest_cls", [RandomForestClassifier, ExtraTreesClassifier])
+def test_forests_compile_exactly(data, forest_cls):
+    X, y = data
+    model = forest_cls(n_estimators=10, random_state=0).fit(X, y)
+    compiled = compile_model(model)
+    assert isinstance(compiled, CompiledForest)
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X))
+
+@pytest.mark.parametrize("model", [
+    BaggingClassifier(n_estimators=10, max_features=0.5, random_state=0),
+    AdaBoostClassifier(n_estimators=10, random_state=0),
+])
+def test_other_ensembles_pass_through(data, model):
+    X, y = data
+    model.fit(X, y)
+    assert compile_model(model) is model
@@ -0,0 +1,133 @@
+"""
+SessionHandsPool leasing with stub trackers: LRU eviction, release, the size bound
+and instances built outside the pool lock.
+
+Usage: python -m pytest tests/
+"""
+import os
+import queue
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hands_pool import SessionHandsPool
+
+TIMEOUT = 5.0
+
+class StubHands:
+    def __init__(self, index):
+        self.index = index
+        self.resets = 0
+
+    def process(self, frame):
+        return frame
+
+    def reset(self):
+        self.resets += 1
+
+class StubFactory:
+    """Builds StubHands; with `gate` set up, each build waits for it."""
+
+    def __init__(self, gated=False):
+        self.built = []
+        self.started = queue.Queue()
+        self.gate = threading.Event()
+        if not gated:
+            self.gate.set()
+
+    def __call__(self):
+        self.started.put(len(self.built))
+        assert self.gate.wait(TIMEOUT)
+        hands = StubHands(len(self.built))
+        self.built.append(hands)
+        return hands
+
+def lease(pool, sid):
+    with pool.session(sid) as hands:
+        return hands
+
+def test_session_keeps_its_instance():
+    pool = SessionHandsPool(2, StubFactory())
+    first = lease(pool, "a")
+    assert lease(pool, "a") is first
+    assert lease(pool, "b") is not first
+
+def test_pool_size_is_enforced_by_evicting_the_lru_session():
+    factory = StubFactory()
+    pool = SessionHandsPool(2, factory)
+    a, b = lease(pool, "a"), lease(pool, "b")
+    lease(pool, "a")  # b is now the least recently used
+
+    c = lease(pool, "c")
+    assert c is b
+    assert len(factory.built) == 2
+    assert pool.stats() == {'size': 2, 'leased': 2, 'spare': 0, 'evictions': 1}
+    assert lease(pool, "a") is a
+
+def test_evicted_session_gets_a_fresh_tracker():
+    pool = SessionHandsPool(1, StubFactory())
+    a = lease(pool, "a")
+    assert a.resets == 0
+
+    lease(pool, "b")
+    assert a.resets == 1
+    # a re-leases on its next frame, evicting b; the tracker is reset again
+    assert lease(pool, "a") is a
+    assert a.resets == 2
+
+def test_release_recycles_the_instance():
+    factory = StubFactory()
+    pool = SessionHandsPool(2, factory)
+    a = lease(pool, "a")
+    pool.release("a")
+    assert a.resets == 1
+    assert pool.stats()['spare'] == 1
+
+    assert lease(pool, "b") is a
+    assert len(factory.built) == 1
+    assert pool.stats()['evictions'] == 0
+
+def test_release_during_a_frame_recycles_after_it():
+    pool = SessionHandsPool(2, StubFactory())
+    with pool.session("a") as a:
+        pool.release("a")
+        assert a.resets == 0
+    assert a.resets == 1
+    assert pool.stats()['spare'] == 1
+
+def test_full_pool_of_busy_sessions_waits():
+    pool = SessionHandsPool(1, StubFactory())
+    got = []
+    with pool.session("a") as a:
+        waiter = threading.Thread(target=lambda: got.append(lease(pool, "b")))
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+    waiter.join(TIMEOUT)
+    assert got == [a]
+
+def test_build_runs_outside_the_lock():
+    factory = StubFactory(gated=True)
+    pool = SessionHandsPool(3, factory)
+    factory.gate.set()
+    b = lease(pool, "b")
+    factory.gate.clear()
+    factory.started.get(timeout=TIMEOUT)
+
+    # Two frames of a new session both start building while other sessions keep going
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(lease(pool, "a"))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    factory.started.get(timeout=TIMEOUT)
+    factory.started.get(timeout=TIMEOUT)
+    assert lease(pool, "b") is b
+    assert pool.stats()['leased'] == 1
+
+    factory.gate.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+    # Both frames share one tracker; the extra build is kept as a spare
+    assert len(got) == 2 and got[0] is got[1]
+    assert pool.stats() == {'size': 3, 'leased': 2, 'spare': 1, 'evictions': 0}
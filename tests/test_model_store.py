@@ -0,0 +1,92 @@
+"""
+load_model only serves model.forest when it was exported from the current model.p.
+
+Usage: python -m pytest tests/
+"""
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from fast_forest import compile_model
+from model_store import load_forest_artifact, load_model, save_forest_artifact
+
+def make_model_dict(labels, trained_at):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 8))
+    y = np.array(labels)[np.argmax(X[:, :len(labels)], axis=1)]
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    return {'model': model, 'classes': list(model.classes_), 'trained_at': trained_at,
+            'version': 1, 'accuracy': 1.0}
+
+def write_pickle(path, model_dict):
+    with open(path, "wb") as f:
+        pickle.dump(model_dict, f)
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "model.forest"), str(tmp_path / "model.p")
+
+def test_linked_artifact_is_used(paths):
+    import train_model
+
+    artifact, pickle_path = paths
+    train_model.save_model(make_model_dict(["A", "B"], "2026-01-01"), pickle_path, artifact)
+
+    _, info = load_model(artifact, pickle_path)
+    assert info['source'] == artifact
+    assert info['trained_at'] == "2026-01-01"
+
+def test_touched_pickle_still_matches(paths):
+    import train_model
+
+    artifact, pickle_path = paths
+    train_model.save_model(make_model_dict(["A", "B"], "2026-01-01"), pickle_path, artifact)
+    os.utime(pickle_path, ns=(0, 0))
+
+    _, info = load_model(artifact, pickle_path)
+    assert info['source'] == artifact
+
+def test_replaced_pickle_wins_and_is_re_exported(paths):
+    import train_model
+
+    artifact, pickle_path = paths
+    train_model.save_model(make_model_dict(["A", "B"], "2026-01-01"), pickle_path, artifact)
+    # A newer model.p lands without its artifact (copied in, older script, ...)
+    write_pickle(pickle_path, make_model_dict(["A", "B", "C"], "2026-02-01"))
+
+    model, info = load_model(artifact, pickle_path)
+    assert info['source'] == pickle_path
+    assert info['trained_at'] == "2026-02-01"
+    assert list(model.classes_) == ["A", "B", "C"]
+
+    _, header = load_forest_artifact(artifact)
+    assert header['trained_at'] == "2026-02-01"
+    _, info = load_model(artifact, pickle_path)
+    assert info['source'] == artifact
+    assert info['classes'] == ["A", "B", "C"]
+
+def test_unlinked_artifact_is_stale(paths):
+    artifact, pickle_path = paths
+    model_dict = make_model_dict(["A", "B"], "2026-01-01")
+    write_pickle(pickle_path, model_dict)
+    # Older exports carry no source_pickle link
+    save_forest_artifact(artifact, compile_model(model_dict['model']), model_dict)
+
+    _, info = load_model(artifact, pickle_path)
+    assert info['source'] == pickle_path
+    _, header = load_forest_artifact(artifact)
+    assert header['source_pickle']['size'] == os.path.getsize(pickle_path)
+
+def test_artifact_without_pickle_is_used(paths):
+    artifact, pickle_path = paths
+    model_dict = make_model_dict(["A", "B"], "2026-01-01")
+    save_forest_artifact(artifact, compile_model(model_dict['model']), model_dict)
+
+    _, info = load_model(artifact, pickle_path)
+    assert info['source'] == artifact
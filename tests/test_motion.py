@@ -0,0 +1,74 @@
+"""
+MotionWindow's incremental features match a full recompute over the window, and a
+tracking gap (an all-zero keypoint row) restarts the window.
+
+Usage: python -m pytest tests/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pytest
+
+from motion import MOTION_FEATURE_SIZE, MotionWindow, window_features
+from utils import KEYPOINT_SIZE
+
+def recompute_features(window):
+    """Every feature from the full (n, KEYPOINT_SIZE) window, oldest frame first."""
+    return np.concatenate([
+        window.mean(axis=0), window.std(axis=0), window[-1] - window[0],
+        window[-1] - window[-2], np.abs(np.diff(window, axis=0)).mean(axis=0)
+    ])
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(0, 0.05, (n, KEYPOINT_SIZE)), axis=0) + 1.0
+
+@pytest.mark.parametrize("size", [2, 5, 16])
+def test_incremental_matches_recompute(size):
+    rows = random_walk(200)
+    # A short refresh interval exercises the exact recompute of the running sums too
+    window = MotionWindow(size, refresh_every=7)
+    for t, row in enumerate(rows):
+        features = window.push(row)
+        expected = recompute_features(rows[max(0, t - size + 1):t + 1]) if t >= 1 else None
+        if t + 1 < size:
+            assert features is None
+            if expected is not None:
+                np.testing.assert_allclose(window.features(), expected, atol=1e-9)
+        else:
+            np.testing.assert_allclose(features, expected, atol=1e-9)
+        np.testing.assert_array_equal(window.ordered(), rows[max(0, t - size + 1):t + 1])
+
+def test_reset_starts_a_fresh_window():
+    rows = random_walk(20)
+    window = MotionWindow(4)
+    for row in rows[:10]:
+        window.push(row)
+    window.reset()
+
+    fresh = MotionWindow(4)
+    for row in rows[10:]:
+        np.testing.assert_array_equal(window.push(row), fresh.push(row))
+
+def test_tracking_gap_restarts_the_window():
+    size = 4
+    first, second = random_walk(6, seed=1), random_walk(7, seed=2)
+    rows = np.vstack([first, np.zeros((1, KEYPOINT_SIZE)), second])
+
+    features = window_features(rows, size)
+    # No window spans the gap: each side contributes only its own full windows
+    assert features.shape == (6 - size + 1 + 7 - size + 1, MOTION_FEATURE_SIZE)
+    np.testing.assert_allclose(features[:3], window_features(first, size))
+    np.testing.assert_allclose(features[3:], window_features(second, size))
+    np.testing.assert_allclose(features[3], recompute_features(second[:size]), atol=1e-9)
+
+def test_gap_shorter_than_a_window_yields_nothing():
+    rows = np.vstack([random_walk(3), np.zeros((1, KEYPOINT_SIZE)), random_walk(3, seed=1)])
+    assert window_features(rows, 4).shape == (0, MOTION_FEATURE_SIZE)
+
+def test_stride_skips_windows():
+    rows = random_walk(10)
+    np.testing.assert_allclose(window_features(rows, 4, stride=3), window_features(rows, 4)[::3])
@@ -0,0 +1,65 @@
+"""
+FramePacer's processing-time average, warm-up handling and 20% hysteresis.
+
+Usage: python -m pytest tests/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytest
+
+from pacing import FramePacer
+
+def make_pacer(**kwargs):
+    options = dict(active_interval_ms=80, idle_interval_ms=500, idle_after=3.0, headroom=1.0,
+                   smoothing=0.5, warmup_frames=0, now=0.0)
+    options.update(kwargs)
+    return FramePacer(**options)
+
+def test_average_starts_at_the_active_interval():
+    pacer = make_pacer()
+    assert pacer.processing_ms == 80
+    pacer.observe(True, 0.200, now=0.1)
+    assert pacer.processing_ms == pytest.approx(140)
+    pacer.observe(True, 0.200, now=0.2)
+    assert pacer.processing_ms == pytest.approx(170)
+
+def test_warm_up_frames_are_ignored():
+    pacer = make_pacer(warmup_frames=2)
+    assert pacer.observe(True, 3.0, now=0.1) is None
+    assert pacer.observe(True, 2.0, now=0.2) is None
+    assert pacer.processing_ms == 80
+    assert pacer.interval_ms == 80
+
+def test_slow_samples_are_capped():
+    pacer = make_pacer(max_interval_ms=1000)
+    pacer.observe(True, 5.0, now=0.1)
+    assert pacer.processing_ms == pytest.approx(540)
+
+def test_queue_depth_scales_the_interval():
+    pacer = make_pacer(smoothing=1.0)
+    update = pacer.observe(True, 0.100, queue_depth=2, now=0.1)
+    assert update == {'mode': 'active', 'interval_ms': 300, 'max_width': None}
+
+def test_small_changes_are_held_back():
+    pacer = make_pacer(smoothing=1.0)
+    assert pacer.observe(True, 0.200, now=0.1)['interval_ms'] == 200
+    # Within 20% of the current target: no update
+    assert pacer.observe(True, 0.230, now=0.2) is None
+    assert pacer.observe(True, 0.170, now=0.3) is None
+    assert pacer.observe(True, 0.250, now=0.4)['interval_ms'] == 250
+
+def test_reaching_the_floor_is_always_sent():
+    pacer = make_pacer(smoothing=1.0)
+    assert pacer.observe(True, 0.095, now=0.1)['interval_ms'] == 100
+    # 80 ms is within 20% of 100 ms, but it is the floor, so it goes out
+    assert pacer.observe(True, 0.050, now=0.2)['interval_ms'] == 80
+    assert pacer.observe(True, 0.050, now=0.3) is None
+
+def test_idle_and_back():
+    pacer = make_pacer()
+    assert pacer.observe(False, 0.010, now=1.0) is None
+    assert pacer.observe(False, 0.010, now=3.5) == {'mode': 'idle', 'interval_ms': 500, 'max_width': 320}
+    assert pacer.observe(True, 0.010, now=4.0) == {'mode': 'active', 'interval_ms': 80, 'max_width': None}
@@ -0,0 +1,78 @@
+"""
+ProbabilitySmoother's enter/exit hysteresis and margin-based class switch, and the
+legacy N-identical buffer.
+
+Usage: python -m pytest tests/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytest
+
+from smoothing import IDLE_LABEL, LegacyBuffer, ProbabilitySmoother, make_smoother
+
+def feed(smoother, frames):
+    return [smoother.update(scores) for scores in frames]
+
+def settled(label, frames=10):
+    """A smoother that has seen `label` with certainty for a while."""
+    smoother = ProbabilitySmoother(alpha=0.5, enter=0.5, exit=0.3, margin=0.1)
+    feed(smoother, [{label: 1.0}] * frames)
+    return smoother
+
+def test_confident_frame_enters_at_once():
+    smoother = ProbabilitySmoother(alpha=0.5, enter=0.5)
+    assert smoother.update({"A": 1.0}) == "A"
+    assert smoother.scores["A"] == pytest.approx(0.5)
+
+def test_enter_threshold():
+    smoother = ProbabilitySmoother(alpha=0.5, enter=0.5)
+    # 0.4, then 0.6 averaged: only the second frame reaches `enter`
+    assert feed(smoother, [{"A": 0.8}, {"A": 0.8}]) == [IDLE_LABEL, "A"]
+
+def test_exit_threshold_holds_between_exit_and_enter():
+    smoother = settled("A")
+    # No hand: A decays 1.0 -> 0.5 -> 0.25; it stays above `exit` (0.3) on the first frame
+    assert feed(smoother, [{}, {}]) == ["A", IDLE_LABEL]
+
+def test_weak_frames_keep_the_current_label():
+    smoother = settled("A")
+    # A settles at 0.4: below `enter` but above `exit`, so it is kept
+    assert feed(smoother, [{"A": 0.4}] * 10) == ["A"] * 10
+
+def test_one_noisy_frame_does_not_switch():
+    smoother = settled("A")
+    # A and B both at 0.5: B reaches `enter` but does not lead by `margin`
+    assert smoother.update({"B": 1.0}) == "A"
+    assert smoother.update({"A": 1.0}) == "A"
+
+def test_switch_needs_the_margin():
+    smoother = settled("A")
+    # A 0.25 / B 0.75 after two frames: B leads by more than `margin`
+    assert feed(smoother, [{"B": 1.0}, {"B": 1.0}]) == ["A", "B"]
+
+def test_switch_by_margin_before_exit():
+    smoother = settled("A")
+    labels = feed(smoother, [{"A": 0.35, "B": 0.65}] * 4)
+    assert labels[-1] == "B"
+    # The switch happened while A was still above `exit`
+    assert smoother.scores["A"] > smoother.exit
+
+def test_new_labels_after_a_model_reload():
+    smoother = settled("A")
+    assert feed(smoother, [{"Z": 1.0}] * 3)[-1] == "Z"
+    smoother.reset()
+    assert smoother.current == IDLE_LABEL and smoother.scores == {}
+
+def test_legacy_buffer_needs_identical_frames():
+    buffer = LegacyBuffer(3)
+    frames = [{"A": 0.9}, {"A": 0.9}, {"B": 0.9}, {"A": 0.9}, {"A": 0.9}, {"A": 0.9}, {}]
+    assert feed(buffer, frames) == [IDLE_LABEL, IDLE_LABEL, IDLE_LABEL, IDLE_LABEL, IDLE_LABEL, "A", "A"]
+
+def test_make_smoother():
+    assert isinstance(make_smoother('buffer', 5), LegacyBuffer)
+    smoother = make_smoother('ema', alpha=0.3, enter=0.6, exit=0.2, margin=0.05)
+    assert isinstance(smoother, ProbabilitySmoother)
+    assert (smoother.alpha, smoother.enter, smoother.exit, smoother.margin) == (0.3, 0.6, 0.2, 0.05)
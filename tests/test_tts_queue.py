@@ -0,0 +1,95 @@
+"""
+TTSQueue: one job per phrase, a bounded backlog that rejects instead of blocking,
+and failed jobs that can be retried.
+
+Usage: python -m pytest tests/
+"""
+import os
+import queue
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tts_queue import TTSQueue
+
+TIMEOUT = 5.0
+
+class Recorder:
+    """synthesize/on_done stubs; synthesize blocks until `gate` is set."""
+
+    def __init__(self, fail=()):
+        self.gate = threading.Event()
+        self.started = queue.Queue()
+        self.done = queue.Queue()
+        self.calls = []
+        self.fail = set(fail)
+
+    def synthesize(self, key):
+        self.calls.append(key)
+        self.started.put(key)
+        assert self.gate.wait(TIMEOUT)
+        if key in self.fail:
+            raise RuntimeError("gTTS unavailable")
+
+    def on_done(self, key, waiters, ok):
+        self.done.put((key, sorted(waiters), ok))
+
+def test_concurrent_requests_share_one_job():
+    recorder = Recorder()
+    tts = TTSQueue(recorder.synthesize, recorder.on_done, max_workers=2)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def request(sid):
+        barrier.wait()
+        results.append(tts.submit("Hello", sid))
+
+    threads = [threading.Thread(target=request, args=(f"sid{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(TIMEOUT)
+    recorder.gate.set()
+
+    assert recorder.done.get(timeout=TIMEOUT) == ("Hello", [f"sid{i}" for i in range(8)], True)
+    assert recorder.calls == ["Hello"]
+    assert sorted(results) == ["joined"] * 7 + ["queued"]
+    assert tts.stats()['joined'] == 7
+
+def test_full_queue_rejects_without_blocking():
+    recorder = Recorder()
+    tts = TTSQueue(recorder.synthesize, recorder.on_done, max_workers=1, max_pending=2)
+    assert tts.submit("Hello", "a") == "queued"
+    assert recorder.started.get(timeout=TIMEOUT) == "Hello"
+    assert tts.submit("Water", "a") == "queued"
+
+    # The worker is stuck on "Hello" and "Water" waits: a third phrase is turned away
+    result = []
+    submitter = threading.Thread(target=lambda: result.append(tts.submit("Yes", "b")))
+    submitter.start()
+    submitter.join(TIMEOUT)
+    assert not submitter.is_alive()
+    assert result == ["rejected"]
+    # Joining a phrase already in flight still works
+    assert tts.submit("Water", "b") == "joined"
+
+    recorder.gate.set()
+    assert {recorder.done.get(timeout=TIMEOUT)[0] for _ in range(2)} == {"Hello", "Water"}
+    assert tts.stats()['rejected'] == 1
+    assert "Yes" not in recorder.calls
+
+def test_failed_job_notifies_waiters_and_can_be_retried():
+    recorder = Recorder(fail={"Hello"})
+    tts = TTSQueue(recorder.synthesize, recorder.on_done, max_workers=1)
+    recorder.gate.set()
+
+    assert tts.submit("Hello", "a") == "queued"
+    assert recorder.done.get(timeout=TIMEOUT) == ("Hello", ["a"], False)
+    assert tts.stats()['failed'] == 1
+    assert tts.stats()['pending'] == 0
+
+    recorder.fail.clear()
+    assert tts.submit("Hello", "b") == "queued"
+    assert recorder.done.get(timeout=TIMEOUT) == ("Hello", ["b"], True)
+    assert tts.stats()['completed'] == 1
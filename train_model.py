@@ -1,83 +1,263 @@
-import pandas as pd
 import numpy as np
 import pickle
+import os
+import sys
+import time
+import resource
+import tracemalloc
+import argparse
 import datetime
+from contextlib import contextmanager
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, confusion_matrix
+from model_store import export_artifact
+from dataset_store import DatasetStore, LEGACY_CSV
+from motion import MOTION_DATASET_DIR, MOTION_MODEL_FILE, MOTION_ARTIFACT, WINDOW_FRAMES, STATIC_LABEL, window_features
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-DATA_FILE = "data.csv"
+DATASET_DIR = "dataset"
+LEGACY_DATA_FILE = LEGACY_CSV  # Imported into the dataset store once
 MODEL_FILE = "model.p"
+MODEL_ARTIFACT = "model.forest"
+N_ESTIMATORS = 100
+TEST_SIZE = 0.2
+NOISE_LEVELS = (0.0, 0.05, 0.10)  # One training view per level: original, noisy, stronger noise
+AUGMENT_CHUNK_ROWS = 65536        # Rows of noise generated at a time
+MOTION_STATIC_STRIDE = 4          # Static recordings are long holds; every 4th window is plenty
 
-def train_model():
+# --- STAGE REPORTING ---
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+@contextmanager
+def stage(name, timings):
+    """
+    Time a training stage and record its memory.
+    - process_peak_rss_mb: lifetime peak RSS of the process so far. It never goes
+      down, so later stages repeat the largest earlier value.
+    - alloc_peak_mb (only while tracemalloc is tracing, --trace-memory): peak of the
+      Python and NumPy allocations above what was live when the stage started,
+      i.e. the stage's own footprint. Tracing slows fitting, so it is opt-in.
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    timings[name] = {'seconds': round(elapsed, 3), 'process_peak_rss_mb': round(peak_rss_mb(), 1)}
+    memory = f"process peak RSS so far {peak_rss_mb():.1f} MB"
+    if tracing:
+        alloc_peak = (tracemalloc.get_traced_memory()[1] - baseline) / (1024 * 1024)
+        timings[name]['alloc_peak_mb'] = round(alloc_peak, 1)
+        memory = f"stage allocations peak {alloc_peak:.1f} MB, " + memory
+    print(f"⏱️ {name}: {elapsed:.2f}s ({memory})")
+
+# --- AUGMENTATION ---
+def augment_into(out, X, noise, rng, chunk_rows=AUGMENT_CHUNK_ROWS):
+    """Write X plus float32 Gaussian noise into `out`, a chunk at a time (no full-size temporaries)."""
+    for start in range(0, len(X), chunk_rows):
+        stop = min(start + chunk_rows, len(X))
+        block = out[start:stop]
+        block[:] = X[start:stop]
+        if noise:
+            block += rng.standard_normal(block.shape, dtype=np.float32) * np.float32(noise)
+    return out
+
+def augmented_training_set(X, y, rng):
+    """All noise views of the training rows in one preallocated float32 matrix."""
+    X_aug = np.empty((len(X) * len(NOISE_LEVELS), X.shape[1]), dtype=np.float32)
+    for i, noise in enumerate(NOISE_LEVELS):
+        augment_into(X_aug[i * len(X):(i + 1) * len(X)], X, noise, rng)
+    return X_aug, np.tile(y, len(NOISE_LEVELS))
+
+def fit_forest(X_train, y_train, rng, low_memory=False):
+    """
+    Fit the Random Forest on the augmented training rows.
+    - Default: materialize every noise view once, then fit all trees together.
+    - low_memory: fit a share of the trees per noise view with warm_start, so only
+      one view (the size of the training split) exists at a time.
+    """
+    if not low_memory:
+        X_aug, y_aug = augmented_training_set(X_train, y_train, rng)
+        print(f"Augmented samples: {len(X_aug)}")
+        model = RandomForestClassifier(n_estimators=N_ESTIMATORS, n_jobs=-1)
+        model.fit(X_aug, y_aug)
+        return model
+
+    model = RandomForestClassifier(n_estimators=0, n_jobs=-1, warm_start=True)
+    view = np.empty_like(X_train)
+    for i, noise in enumerate(NOISE_LEVELS):
+        # Spread N_ESTIMATORS over the views as evenly as possible
+        model.n_estimators = N_ESTIMATORS * (i + 1) // len(NOISE_LEVELS)
+        model.fit(augment_into(view, X_train, noise, rng), y_train)
+        print(f"  view {i + 1}/{len(NOISE_LEVELS)} (noise {noise}): {model.n_estimators} trees")
+    return model
+
+def save_model(model_dict, model_file=MODEL_FILE, artifact=MODEL_ARTIFACT):
+    """Write model.p and its memory-mappable artifact (or drop a stale one)."""
+    # Write then rename, so a running app never hot-reloads a half-written pickle
+    with open(model_file + '.tmp', 'wb') as f:
+        pickle.dump(model_dict, f)
+    os.replace(model_file + '.tmp', model_file)
+
+    print(f"Model saved to {model_file}")
+
+    # Memory-mappable copy the app loads without unpickling
+    if export_artifact(model_dict['model'], model_dict, artifact, model_file):
+        print(f"Artifact saved to {artifact}")
+
+def load_split(seed=None):
+    """
+    Load the dataset store and split it before any augmentation.
+    Returns (X_train, y_train, X_test, y_test, classes), or None when there is no data.
+    """
     print("Loading data...")
-    try:
-        df = pd.read_csv(DATA_FILE)
-    except FileNotFoundError:
-        print(f"Error: {DATA_FILE} not found. Run data_collector.py first!")
-        return
+    store = DatasetStore(DATASET_DIR)
+    counts = store.import_legacy(LEGACY_DATA_FILE)
+    if counts is not None:
+        print(f"Imported {sum(counts.values())} rows from {LEGACY_DATA_FILE} into {DATASET_DIR}/")
 
     # Check if data is empty
-    if df.empty:
-        print("Error: Data file is empty.")
-        return
-
-    print(f"Data shape: {df.shape}")
-    print(f"Classes found: {df['label'].unique()}")
-
-    # Prepare features (X) and labels (y)
-    # Columns are label, x0, y0, z0, ...
-    X = df.drop('label', axis=1) # All columns except label
-    y = df['label']
-
-    # --- Data Augmentation ---
-    print("Applying Data Augmentation (Noise Injection)...")
-    # Add Gaussian noise
-    noise_factor = 0.05
-    X_noisy = X + np.random.normal(0, noise_factor, X.shape)
-    X_noisy_2 = X + np.random.normal(0, noise_factor * 2, X.shape) # Stronger noise
-
-    # Concatenate original + augmented data
-    X_aug = pd.concat([X, X_noisy, X_noisy_2], ignore_index=True)
-    y_aug = pd.concat([y, y, y], ignore_index=True)
-    
-    print(f"Original samples: {len(X)}")
-    print(f"Augmented samples: {len(X_aug)}")
-
-    # Use Augmented Data for training
-    X, y = X_aug, y_aug
-
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=True, stratify=y)
-
-    # Train Random Forest
-    print("Training Random Forest Classifier...")
-    model = RandomForestClassifier(n_estimators=100, n_jobs=-1)
-    model.fit(X_train, y_train)
-
-    # Evaluate
-    y_pred = model.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
-    print(f"Model Accuracy: {accuracy * 100:.2f}%")
-    
-    # Save model metadata alongside module
-    with open(MODEL_FILE, 'wb') as f:
-        classes_full = df['label'].unique().tolist()
-        pickle.dump({
-            'model': model, 
+    if len(store) == 0:
+        print(f"Error: no recordings in {DATASET_DIR}/. Run data_collector.py first!")
+        return None
+
+    # Prepare features (X) and labels (y); shards are memory-mapped, X is float32
+    X, y = store.load()
+    print(f"Data shape: {X.shape}")
+    print(f"Classes found: {store.labels()}")
+
+    # Split BEFORE augmenting, so noisy copies of a test row never end up in training
+    train_idx, test_idx = train_test_split(
+        np.arange(len(y)), test_size=TEST_SIZE, shuffle=True, stratify=y, random_state=seed
+    )
+    return X[train_idx], y[train_idx], X[test_idx], y[test_idx], store.labels()
+
+def train_model(low_memory=False, seed=None):
+    timings = {}
+    rng = np.random.default_rng(seed)
+
+    with stage("load+split", timings):
+        data = load_split(seed)
+        if data is None:
+            return
+        X_train, y_train, X_test, y_test, classes = data
+        print(f"Original samples: {len(X_train)} train / {len(X_test)} test")
+
+    # --- Data Augmentation (Noise Injection) + Training ---
+    with stage("augment+fit", timings):
+        print("Training Random Forest Classifier...")
+        model = fit_forest(X_train, y_train, rng, low_memory)
+
+    # Evaluate on the untouched, un-augmented test rows
+    with stage("evaluate", timings):
+        y_pred = model.predict(X_test)
+        accuracy = accuracy_score(y_test, y_pred)
+        print(f"Model Accuracy: {accuracy * 100:.2f}%")
+
+    with stage("save", timings):
+        # Save model metadata alongside module
+        model_dict = {
+            'model': model,
             'accuracy': accuracy,
-            'classes': classes_full, 
+            'classes': classes,
             'version': '1.2',
-            'trained_at': datetime.datetime.now().isoformat()
-        }, f)
-    
-    print(f"Model saved to {MODEL_FILE}")
+            'trained_at': datetime.datetime.now().isoformat(),
+            'training_stages': timings
+        }
+        save_model(model_dict)
 
     # Optional: Confusion Matrix
     # cm = confusion_matrix(y_test, y_pred)
     # print("Confusion Matrix:\n", cm)
+    return model_dict
+
+# --- MOTION (DYNAMIC GESTURE) MODEL ---
+def motion_split(rows, window, stride=1):
+    """Time-ordered split of one recording, so overlapping windows never straddle train and test."""
+    cut = int(len(rows) * (1 - TEST_SIZE))
+    return window_features(rows[:cut], window, stride), window_features(rows[cut:], window, stride)
+
+def load_motion_split(window):
+    """
+    Window features for the sequence classifier.
+    - Each dynamic recording in dataset_motion/ is its own class.
+    - Every static recording in dataset/ becomes STATIC_LABEL, the "no movement" class.
+    Returns (X_train, y_train, X_test, y_test, classes), or None when data is missing.
+    """
+    dynamic = DatasetStore(MOTION_DATASET_DIR)
+    static = DatasetStore(DATASET_DIR)
+    if not dynamic.labels():
+        print(f"Error: no recordings in {MOTION_DATASET_DIR}/. Run data_collector.py --dynamic first!")
+        return None
+    if not static.labels():
+        print(f"Error: no static recordings in {DATASET_DIR}/ to learn the {STATIC_LABEL} class from.")
+        return None
+
+    sources = [(label, rows, 1) for label, rows in dynamic.iter_shards()]
+    sources += [(STATIC_LABEL, rows, MOTION_STATIC_STRIDE) for _, rows in static.iter_shards()]
+    parts = {'train': ([], []), 'test': ([], [])}
+    for label, rows, stride in sources:
+        for name, features in zip(('train', 'test'), motion_split(np.asarray(rows), window, stride)):
+            parts[name][0].append(features.astype(np.float32))
+            parts[name][1].append(np.full(len(features), label, dtype=object))
+    X_train, y_train = (np.concatenate(a) for a in parts['train'])
+    X_test, y_test = (np.concatenate(a) for a in parts['test'])
+    print(f"Window features: {X_train.shape[1]} per window, {window} frames per window")
+    return X_train, y_train, X_test, y_test, dynamic.labels() + [STATIC_LABEL]
+
+def train_motion_model(window=WINDOW_FRAMES, seed=None):
+    timings = {}
+
+    with stage("load+features", timings):
+        data = load_motion_split(window)
+        if data is None:
+            return
+        X_train, y_train, X_test, y_test, classes = data
+        print(f"Windows: {len(X_train)} train / {len(X_test)} test, classes: {classes}")
+
+    with stage("fit", timings):
+        print("Training motion Random Forest...")
+        model = RandomForestClassifier(n_estimators=N_ESTIMATORS, n_jobs=-1, random_state=seed)
+        model.fit(X_train, y_train)
+
+    with stage("evaluate", timings):
+        accuracy = accuracy_score(y_test, model.predict(X_test)) if len(X_test) else float('nan')
+        print(f"Motion Model Accuracy: {accuracy * 100:.2f}%")
+
+    with stage("save", timings):
+        model_dict = {
+            'model': model,
+            'accuracy': accuracy,
+            'classes': classes,
+            'window': window,
+            'version': '1.0',
+            'trained_at': datetime.datetime.now().isoformat(),
+            'training_stages': timings
+        }
+        save_model(model_dict, MOTION_MODEL_FILE, MOTION_ARTIFACT)
+    return model_dict
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the gesture classifier from the dataset store")
+    parser.add_argument('--low-memory', action='store_true',
+                        help="Fit trees one noise view at a time (warm_start) instead of materializing all views")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--motion', action='store_true',
+                        help="Train the dynamic gesture (sequence) model from dataset_motion/ instead")
+    parser.add_argument('--window', type=int, default=WINDOW_FRAMES, help="Frames per motion window")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Report each stage's own allocation peak (tracemalloc; slows fitting)")
+    args = parser.parse_args()
+    if args.trace_memory:
+        tracemalloc.start()
+    if args.motion:
+        train_motion_model(window=args.window, seed=args.seed)
+    else:
+        train_model(low_memory=args.low_memory, seed=args.seed)
@@ -0,0 +1,94 @@
+import os
+import queue
+import tempfile
+import threading
+
+def write_atomically(path, write):
+    """
+    Call write(tmp_path) on a temp file next to `path`, then rename it into place.
+    - Readers (and the static file server) never see a half-written mp3.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class TTSQueue:
+    """
+    Bounded text-to-speech job queue shared by all sessions.
+    - `max_workers` threads run `synthesize(key)`; nothing else spawns TTS threads.
+    - Singleflight: a key that is already queued or running is not submitted again;
+      the new waiter joins the in-flight job instead.
+    - At most `max_pending` distinct keys wait at once; further misses are rejected
+      (the phrase is simply not spoken this time and is retried on the next trigger).
+    - `on_done(key, waiters, ok)` is called once per job with every waiter that joined it.
+    """
+
+    def __init__(self, synthesize, on_done, max_workers=2, max_pending=32):
+        self.synthesize = synthesize
+        self.on_done = on_done
+        self.max_pending = max(1, int(max_pending))
+        self._lock = threading.Lock()
+        self._waiters = {}  # key -> list of waiters, for queued and running jobs
+        self._queue = queue.Queue()
+        self._completed = 0
+        self._failed = 0
+        self._joined = 0
+        self._rejected = 0
+        for i in range(max(1, int(max_workers))):
+            threading.Thread(target=self._run, name=f"tts-worker-{i}", daemon=True).start()
+
+    def submit(self, key, waiter=None):
+        """Request audio for `key`. Returns 'queued', 'joined' or 'rejected'."""
+        with self._lock:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                if waiter not in waiters:
+                    waiters.append(waiter)
+                self._joined += 1
+                return 'joined'
+            if len(self._waiters) >= self.max_pending:
+                self._rejected += 1
+                return 'rejected'
+            self._waiters[key] = [waiter]
+        self._queue.put(key)
+        return 'queued'
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            try:
+                self.synthesize(key)
+                ok = True
+            except Exception as e:
+                print(f"❌ [TTS] {key}: {e}")
+                ok = False
+            # Drop the key before notifying so a failed phrase can be retried later
+            with self._lock:
+                waiters = self._waiters.pop(key, [])
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+            try:
+                self.on_done(key, waiters, ok)
+            except Exception as e:
+                print(f"⚠️ [TTS] Notify error: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._waiters),
+                'max_pending': self.max_pending,
+                'completed': self._completed,
+                'failed': self._failed,
+                'joined': self._joined,
+                'rejected': self._rejected
+            }
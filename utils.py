@@ -2,11 +2,34 @@ import cv2
 import mediapipe as mp
 import numpy as np
 
-def extract_keypoints(results):
+KEYPOINT_SIZE = 21 * 3 * 2  # 126 values: Left hand then Right hand
+
+def normalize_hand(landmarks):
     """
-    Extracts normalized landmarks from both hands.
+    Normalizes one hand's (21, 3) landmark array.
     - Centers coordinates relative to the WRIST.
     - Scales coordinates based on hand size (WRIST to MIDDLE_MCP distance).
+    - Returns a flattened array of 63 values.
+    """
+    # 1. Centering: Subtract Wrist (Landmark 0)
+    wrist = landmarks[0]
+    centered = landmarks - wrist
+    
+    # 2. Scaling: Normalize by distance between Wrist(0) and Middle MCP(9)
+    # This makes the features invariant to camera distance/hand size.
+    # We use a small epsilon to avoid division by zero.
+    middle_mcp = landmarks[9]
+    scale = np.linalg.norm(middle_mcp - wrist)
+    if scale < 1e-6: scale = 1.0 # Fallback
+    
+    normalized = centered / scale
+    
+    # Flatten
+    return normalized.flatten()
+
+def extract_keypoints(results):
+    """
+    Extracts normalized landmarks from both hands.
     - Returns a flattened list of 126 values (63 for Left, 63 for Right).
     - If a hand is missing, fills with zeros.
     """
@@ -20,24 +43,9 @@ def extract_keypoints(results):
             # Note: In selfie view, "Left" is usually your actual right hand, but we keep the label consistent.
             label = handedness.classification[0].label
             
-            # 1. Get Landmarks as array
+            # Get Landmarks as array
             landmarks = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark])
-            
-            # 2. Centering: Subtract Wrist (Landmark 0)
-            wrist = landmarks[0]
-            centered = landmarks - wrist
-            
-            # 3. Scaling: Normalize by distance between Wrist(0) and Middle MCP(9)
-            # This makes the features invariant to camera distance/hand size.
-            # We use a small epsilon to avoid division by zero.
-            middle_mcp = landmarks[9]
-            scale = np.linalg.norm(middle_mcp - wrist)
-            if scale < 1e-6: scale = 1.0 # Fallback
-            
-            normalized = centered / scale
-            
-            # Flatten
-            flat_hand = normalized.flatten()
+            flat_hand = normalize_hand(landmarks)
 
             # Assign to correct slot
             if label == 'Left':
@@ -47,3 +55,15 @@ def extract_keypoints(results):
 
     # Concatenate Left + Right
     return np.concatenate([lh, rh])
+
+def keypoints_from_landmarks(landmarks):
+    """
+    Builds the extract_keypoints vector from raw client landmarks.
+    - Expects 126 values shaped (2, 21, 3): Left hand first, then Right hand.
+    - A hand that is all zeros is treated as missing and stays zero.
+    """
+    hands = np.asarray(landmarks, dtype=np.float64).reshape(2, 21, 3)
+    return np.concatenate([
+        normalize_hand(hand) if np.any(hand) else np.zeros(21 * 3)
+        for hand in hands
+    ])
@@ -0,0 +1,75 @@
+import collections
+import hashlib
+import os
+import threading
+from types import MappingProxyType
+
+LANG_CODES = {'hindi': 'hi', 'english': 'en', 'bengali': 'bn'}
+
+Utterance = collections.namedtuple('Utterance', 'text lang_code url path size etag')
+
+def audio_location(lang, polite, gesture, audio_dir="static/audio"):
+    """Relative mp3 path for an utterance, e.g. static/audio/hindi_polite/water_polite.mp3."""
+    folder_name = f"{lang}_polite" if polite else lang
+    filename = gesture.lower().replace(" ", "_")
+    if polite:
+        filename += "_polite"
+    return f"{audio_dir}/{folder_name}/{filename}.mp3"
+
+def _file_info(full_path):
+    """(size, etag) of an audio file, or (None, None) when it does not exist yet."""
+    try:
+        with open(full_path, "rb") as f:
+            content = f.read()
+    except OSError:
+        return None, None
+    return len(content), '"' + hashlib.sha1(content).hexdigest()[:16] + '"'
+
+class UtteranceIndex:
+    """
+    Immutable (lang, polite, gesture) -> Utterance lookup built at startup.
+    - One dictionary lookup gives the sentence text, TTS language code, audio URL,
+      file size and ETag, so the per-frame path never touches the filesystem.
+    - size/etag are None while the mp3 has not been generated yet.
+    - refresh() rebuilds a single entry (after a TTS job) and swaps in a new mapping.
+    """
+
+    def __init__(self, translations, audio_dir="static/audio", root=None):
+        self.audio_dir = audio_dir
+        self.root = root or os.getcwd()
+        self._lock = threading.Lock()
+        entries = {}
+        for lang, maps in translations.items():
+            for polite in (False, True):
+                for gesture, text in maps.get("polite" if polite else "standard", {}).items():
+                    entries[(lang, polite, gesture)] = self._build(lang, polite, gesture, text)
+        self._entries = MappingProxyType(entries)
+
+    def _build(self, lang, polite, gesture, text):
+        relative_path = audio_location(lang, polite, gesture, self.audio_dir)
+        full_path = os.path.join(self.root, relative_path)
+        size, etag = _file_info(full_path)
+        return Utterance(text, LANG_CODES.get(lang, 'bn'), "/" + relative_path, full_path, size, etag)
+
+    def get(self, lang, polite, gesture):
+        return self._entries.get((lang, bool(polite), gesture))
+
+    def refresh(self, lang, polite, gesture):
+        """Re-stat one utterance's audio file and publish a new immutable mapping."""
+        key = (lang, bool(polite), gesture)
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None:
+                return None
+            entries = dict(self._entries)
+            entries[key] = self._build(lang, bool(polite), gesture, current.text)
+            self._entries = MappingProxyType(entries)
+            return entries[key]
+
+    def manifest(self, lang, polite):
+        """Generated audio for one language/mode, for client-side preloading."""
+        return {
+            gesture: {'url': u.url, 'size': u.size, 'etag': u.etag}
+            for (l, p, gesture), u in self._entries.items()
+            if l == lang and p == bool(polite) and u.size is not None
+        }